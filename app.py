@@ -1,5 +1,6 @@
 import streamlit as st
 import requests
+import json
 import time
 
 # Base URL of your FastAPI backend
@@ -62,19 +63,52 @@ def upload_document(uploaded_file):
     files = {"file": (uploaded_file.name, uploaded_file, uploaded_file.type)}
     cookies = {"session_id": st.session_state["session_id"]}
     response = requests.post(f"{BASE_URL}/upload", files=files, cookies=cookies)
-    if response.status_code == 200:
-        return True, "Document uploaded and processed successfully!"
-    else:
+    if response.status_code != 200:
         return False, response.json().get("detail", "Upload failed.")
 
+    # Processing runs as a background job; poll its status until it finishes
+    job_id = response.json()["job_id"]
+    progress = st.progress(0, text="Processing document...")
+    while True:
+        job = requests.get(f"{BASE_URL}/jobs/{job_id}", cookies=cookies).json()
+        if job.get("status") == "completed":
+            progress.progress(100, text="Processing complete")
+            return True, "Document uploaded and processed successfully!"
+        if job.get("status") == "failed" or "detail" in job:
+            progress.empty()
+            return False, job.get("error") or job.get("detail") or "Processing failed."
+        done = (job.get("chunks_embedded") or 0) + (job.get("chunks_reused") or 0)
+        if job.get("chunks_total"):
+            percent = min(100, int(100 * done / job["chunks_total"]))
+            progress.progress(percent, text=f"Processed {done} of {job['chunks_total']} chunks")
+        elif done:
+            # The total is only known once the whole file has been parsed, so no percentage yet
+            progress.progress(0, text=f"Processed {done} chunks...")
+        time.sleep(1)
+
 # --- Query Function ---
-def send_query(query):
+def stream_query(query):
+    """Yield answer tokens from the streaming /query endpoint as they arrive."""
     cookies = {"session_id": st.session_state["session_id"]}
-    response = requests.post(f"{BASE_URL}/query", json={"query": query}, cookies=cookies)
-    if response.status_code == 200:
-        return response.json().get("answer", "No answer found.")
-    else:
-        return f"Error: {response.json().get('detail', 'Query failed.')}"
+    with requests.post(f"{BASE_URL}/query/stream", json={"query": query}, cookies=cookies, stream=True) as response:
+        if response.status_code != 200:
+            yield f"Error: {response.json().get('detail', 'Query failed.')}"
+            return
+
+        event = None
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                event = None
+            elif line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data = json.loads(line[len("data:"):])
+                if event == "error":
+                    yield f"\n\nError: {data.get('detail', 'Query failed.')}"
+                    return
+                if event == "done":
+                    return
+                yield data.get("token", "")
 
 # --- Authentication Modal ---
 def show_auth_modal():
@@ -280,12 +314,17 @@ with col2:
                 "role": "user",
                 "content": user_input
             })
+            # Render tokens as they stream in instead of waiting for the full answer
+            response_placeholder = st.empty()
+            ai_response = ""
             with st.spinner("Getting response..."):
-                ai_response = send_query(user_input)
-                st.session_state["messages"].append({
-                    "role": "assistant",
-                    "content": ai_response
-                })
+                for token in stream_query(user_input):
+                    ai_response += token
+                    response_placeholder.markdown(f'<div class="ai-message">🤖 {ai_response}</div>', unsafe_allow_html=True)
+            st.session_state["messages"].append({
+                "role": "assistant",
+                "content": ai_response or "No answer found."
+            })
             st.rerun()
 
     # Upload Modal
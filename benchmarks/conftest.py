@@ -0,0 +1,124 @@
+"""
+
+Benchmark setup. The UltraSafe APIs and the Pinecone data plane are replaced by local fake
+servers, so the suite runs offline; the application modules read their endpoints from the
+environment, which is set here before any of them is imported.
+
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_servers import FakePinecone, FakeUltraSafe, free_port  # noqa: E402
+from benchmarks.documents import MAKERS, SIZES  # noqa: E402
+
+
+ULTRASAFE_PORT = free_port()
+PINECONE_PORT = free_port()
+WORK_DIR = tempfile.mkdtemp(prefix="rag-bench-")
+
+for key, value in {
+    "ULTRASAFE_API_KEY": "bench",
+    "ULTRASAFE_API_EMBEDDINGS_BASE": f"http://127.0.0.1:{ULTRASAFE_PORT}/embeddings",
+    "ULTRASAFE_RERANKER_URL": f"http://127.0.0.1:{ULTRASAFE_PORT}/reranker",
+    "ULTRASAFE_CHAT_URL": f"http://127.0.0.1:{ULTRASAFE_PORT}/chat/completions",
+    "EMBEDDING_CACHE_ENABLED": "false",
+    "ANSWER_CACHE_ENABLED": "false",
+    "CHUNK_STORE_PATH": os.path.join(WORK_DIR, "chunks.db"),
+    "LOCAL_INDEX_DIR": os.path.join(WORK_DIR, "vector_index"),
+    "LANGFUSE_TRACING_ENABLED": "false",
+}.items():
+    os.environ.setdefault(key, value)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--upstream-latency-ms",
+        type=float,
+        default=float(os.getenv("BENCH_UPSTREAM_LATENCY_MS", "5")),
+        help="Latency added by the fake UltraSafe and Pinecone servers to every request.",
+    )
+
+
+@pytest.fixture(scope="session")
+def event_loop_runner():
+    """
+
+    Run coroutines on one event loop for the whole session, since the shared HTTP clients
+    are bound to the loop they were created on.
+
+    """
+
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    from src.vectorstore.http_client import close_async_http_client
+
+    loop.run_until_complete(close_async_http_client())
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def ultrasafe_server(request):
+    server = FakeUltraSafe(
+        port=ULTRASAFE_PORT, latency_ms=request.config.getoption("--upstream-latency-ms")
+    )
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def pinecone_server(request):
+    server = FakePinecone(
+        port=PINECONE_PORT, latency_ms=request.config.getoption("--upstream-latency-ms")
+    )
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def pinecone_index(pinecone_server, event_loop_runner):
+    """
+
+    The application's Pinecone VectorIndex, backed by the real asyncio client talking to the fake server.
+
+    """
+
+    from pinecone import Pinecone
+    from src.vectorstore.vector_index import PineconeVectorIndex
+    import src.config.vector_index as vector_index_config
+
+    async def create():
+        client = Pinecone(api_key="bench").IndexAsyncio(host=pinecone_server.url)
+        return PineconeVectorIndex(client)
+
+    index = event_loop_runner(create())
+    vector_index_config._vector_index = index
+    yield index
+    event_loop_runner(index.close())
+    vector_index_config._vector_index = None
+
+
+@pytest.fixture(scope="session")
+def documents(tmp_path_factory):
+    """
+
+    Generated PDF, DOCX and TXT fixtures of each size, keyed by (kind, size).
+
+    """
+
+    directory = tmp_path_factory.mktemp("documents")
+    paths = {}
+    for kind, make in MAKERS.items():
+        for size, pages in SIZES.items():
+            path = str(directory / f"{size}.{kind}")
+            make(path, pages)
+            paths[(kind, size)] = path
+    return paths
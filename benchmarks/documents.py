@@ -0,0 +1,87 @@
+import random
+
+import docx
+
+
+# Pages (PDF), paragraphs of ~40 lines (DOCX, TXT) per fixture size.
+SIZES = {"small": 5, "medium": 50, "large": 200}
+
+WORDS = (
+    "revenue forecast region quarter growth margin customer contract renewal churn pipeline "
+    "invoice ledger account balance policy clause liability warranty term notice section "
+    "schema column table index query latency throughput replica shard cluster node version"
+).split()
+
+
+def page_lines(page: int, lines: int = 40) -> list:
+    rng = random.Random(page)
+    return [
+        f"Section {page}.{line} " + " ".join(rng.choice(WORDS) for _ in range(12))
+        for line in range(lines)
+    ]
+
+
+def make_pdf(path: str, pages: int):
+    """
+
+    Write a plain-text PDF with one page of generated lines per page, without extra dependencies.
+
+    """
+
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add(b"")
+    kids = []
+    for page in range(pages):
+        text = "BT /F1 9 Tf 40 800 Td 11 TL " + " ".join(
+            "(" + line.replace("(", "").replace(")", "") + ") '" for line in page_lines(page)
+        ) + " ET"
+        content = add(b"<< /Length %d >>\nstream\n" % len(text) + text.encode() + b"\nendstream")
+        kids.append(
+            add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] /Contents %d 0 R "
+                b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (pages_id, content, font)
+            )
+        )
+    objects[pages_id - 1] = (
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % kid for kid in kids)
+        + b"] /Count %d >>" % len(kids)
+    )
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        catalog,
+        xref,
+    )
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def make_docx(path: str, pages: int):
+    document = docx.Document()
+    for page in range(pages):
+        document.add_paragraph("\n".join(page_lines(page)))
+    document.save(path)
+
+
+def make_txt(path: str, pages: int):
+    with open(path, "w", encoding="utf-8") as f:
+        for page in range(pages):
+            f.write("\n".join(page_lines(page)) + "\n\n")
+
+
+MAKERS = {"pdf": make_pdf, "docx": make_docx, "txt": make_txt}
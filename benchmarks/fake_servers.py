@@ -0,0 +1,224 @@
+import json
+import socket
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Dict, List
+
+import numpy as np
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def fake_vector(text: str, dimension: int) -> List[float]:
+    """
+
+    Deterministic unit vector for a text, so that repeated runs see identical data.
+
+    """
+
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimension).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class FakeServer:
+    """
+
+    Runs a Starlette app on a local port in a background thread. Every request waits
+    `latency_ms` before it is answered, to stand in for the network and service time.
+
+    """
+
+    def __init__(self, port: int = None, latency_ms: float = 0.0):
+        self.port = port or free_port()
+        self.latency_ms = latency_ms
+        self.requests = 0
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def routes(self) -> List[Route]:
+        raise NotImplementedError
+
+    async def delay(self):
+        self.requests += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+    def start(self):
+        app = Starlette(routes=self.routes())
+        self._server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+
+    def stop(self):
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join()
+
+
+class FakeUltraSafe(FakeServer):
+    """
+
+    Embeddings, reranker and chat-completions endpoints with the response shapes of the
+    UltraSafe API. Rerank scores are the token overlap between query and text. Embedding
+    requests with more than `max_embedding_inputs` inputs are answered with 413, and with
+    `embedding_status` set every embedding request fails with that status; the input count
+    of each embedding request is recorded in `embedding_batches`.
+
+    """
+
+    def __init__(self, port: int = None, latency_ms: float = 0.0, dimension: int = 1024):
+        super().__init__(port, latency_ms)
+        self.dimension = dimension
+        self.max_embedding_inputs = None
+        self.embedding_status = None
+        self.embedding_batches: List[int] = []
+
+    def routes(self) -> List[Route]:
+        return [
+            Route("/embeddings", self.embeddings, methods=["POST"]),
+            Route("/reranker", self.reranker, methods=["POST"]),
+            Route("/chat/completions", self.chat, methods=["POST"]),
+        ]
+
+    async def embeddings(self, request: Request):
+        await self.delay()
+        inputs = (await request.json())["input"]
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        self.embedding_batches.append(len(inputs))
+        if self.embedding_status is not None:
+            return JSONResponse({"detail": "unavailable"}, status_code=self.embedding_status)
+        if self.max_embedding_inputs is not None and len(inputs) > self.max_embedding_inputs:
+            return JSONResponse({"detail": "too many inputs"}, status_code=413)
+        return JSONResponse(
+            {
+                "result": {
+                    "data": [
+                        {"index": i, "embedding": fake_vector(text, self.dimension)}
+                        for i, text in enumerate(inputs)
+                    ]
+                }
+            }
+        )
+
+    async def reranker(self, request: Request):
+        await self.delay()
+        body = await request.json()
+        query_terms = set(body["query"].lower().split())
+        return JSONResponse(
+            {
+                "result": {
+                    "data": [
+                        {"index": i, "score": len(query_terms & set(text.lower().split()))}
+                        for i, text in enumerate(body["texts"])
+                    ]
+                }
+            }
+        )
+
+    async def chat(self, request: Request):
+        await self.delay()
+        body = await request.json()
+        answer = "This is a benchmark answer from the fake chat endpoint."
+        if not body.get("stream"):
+            return JSONResponse({"choices": [{"message": {"content": answer}}]})
+
+        async def events():
+            for token in answer.split(" "):
+                yield f"data: {json.dumps({'choices': [{'delta': {'content': token + ' '}}]})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+
+class FakePinecone(FakeServer):
+    """
+
+    In-memory stand-in for the Pinecone data plane (query, upsert, list, delete), served over
+    HTTP so that the real asyncio Pinecone client can be pointed at it.
+
+    """
+
+    def __init__(self, port: int = None, latency_ms: float = 0.0):
+        super().__init__(port, latency_ms)
+        self.namespaces: Dict[str, Dict[str, dict]] = {}
+
+    def routes(self) -> List[Route]:
+        return [
+            Route("/query", self.query, methods=["POST"]),
+            Route("/vectors/upsert", self.upsert, methods=["POST"]),
+            Route("/vectors/list", self.list, methods=["GET"]),
+            Route("/vectors/delete", self.delete, methods=["POST"]),
+        ]
+
+    async def query(self, request: Request):
+        await self.delay()
+        body = await request.json()
+        namespace = body.get("namespace", "")
+        records = list(self.namespaces.get(namespace, {}).values())
+        matches = []
+        if records:
+            matrix = np.asarray([record["values"] for record in records], dtype=np.float32)
+            scores = matrix @ np.asarray(body["vector"], dtype=np.float32)
+            for i in np.argsort(-scores)[: body["topK"]]:
+                match = {"id": records[i]["id"], "score": float(scores[i])}
+                if body.get("includeMetadata"):
+                    match["metadata"] = records[i].get("metadata", {})
+                if body.get("includeValues"):
+                    match["values"] = records[i]["values"]
+                matches.append(match)
+        return JSONResponse({"matches": matches, "namespace": namespace, "usage": {"readUnits": 1}})
+
+    async def upsert(self, request: Request):
+        await self.delay()
+        body = await request.json()
+        namespace = self.namespaces.setdefault(body.get("namespace", ""), {})
+        for vector in body["vectors"]:
+            namespace[vector["id"]] = vector
+        return JSONResponse({"upsertedCount": len(body["vectors"])})
+
+    async def list(self, request: Request):
+        await self.delay()
+        params = request.query_params
+        namespace = params.get("namespace", "")
+        prefix = params.get("prefix", "")
+        limit = int(params.get("limit", 100))
+        offset = int(params.get("paginationToken") or 0)
+        ids = sorted(i for i in self.namespaces.get(namespace, {}) if i.startswith(prefix))
+        page = ids[offset : offset + limit]
+        response = {
+            "vectors": [{"id": id_} for id_ in page],
+            "namespace": namespace,
+            "usage": {"readUnits": 1},
+        }
+        if offset + limit < len(ids):
+            response["pagination"] = {"next": str(offset + limit)}
+        return JSONResponse(response)
+
+    async def delete(self, request: Request):
+        await self.delay()
+        body = await request.json()
+        namespace = self.namespaces.get(body.get("namespace", ""), {})
+        for id_ in body.get("ids", []):
+            namespace.pop(id_, None)
+        return JSONResponse({})
@@ -0,0 +1,36 @@
+import itertools
+
+import pytest
+from langchain_core.documents import Document
+
+from benchmarks.documents import page_lines
+from src.vectorstore.ingestion_pipeline import BATCH_SIZE, make_chunk_id, process_batch
+
+
+@pytest.mark.parametrize("batch_size", [8, BATCH_SIZE])
+def test_process_batch(benchmark, ultrasafe_server, pinecone_index, event_loop_runner, batch_size):
+    runs = itertools.count()
+
+    def make_batch():
+        # Fresh chunk IDs for every round, as for a new upload.
+        run = next(runs)
+        chunks = []
+        for i in range(batch_size):
+            text = f"run {run} " + " ".join(page_lines(i, lines=6))
+            chunks.append(
+                Document(
+                    page_content=text,
+                    metadata={
+                        "chunk_id": make_chunk_id("bench.txt", text),
+                        "filename": "bench.txt",
+                        "page": i,
+                    },
+                )
+            )
+        return (chunks, pinecone_index, "bench-ingest"), {}
+
+    def run(chunks, index, namespace):
+        return event_loop_runner(process_batch(chunks, index, namespace))
+
+    stored = benchmark.pedantic(run, setup=make_batch, rounds=20)
+    assert stored == batch_size
@@ -0,0 +1,22 @@
+import pytest
+
+from benchmarks.documents import SIZES
+from src.vectorstore.loader import load_document, shutdown_process_pool
+
+
+@pytest.fixture(scope="module", autouse=True)
+def process_pool():
+    yield
+    shutdown_process_pool()
+
+
+@pytest.mark.parametrize("size", list(SIZES))
+@pytest.mark.parametrize("kind", ["pdf", "docx", "txt"])
+def test_load_document(benchmark, documents, kind, size):
+    if kind == "docx":
+        # UnstructuredWordDocumentLoader needs the optional unstructured package.
+        pytest.importorskip("unstructured")
+    pages = benchmark.pedantic(
+        load_document, args=(documents[(kind, size)],), rounds=3, iterations=1
+    )
+    assert pages
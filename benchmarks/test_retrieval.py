@@ -0,0 +1,53 @@
+import random
+
+import pytest
+from langchain_core.documents import Document
+
+from benchmarks.documents import WORDS, page_lines
+from src.vectorstore.ingestion_pipeline import make_chunk_id, process_batch
+from src.vectorstore.retriver import retrieve_relevant_chunks
+from src.vectorstore.ultrasafe_reranker import UltraSafeAIReranker
+
+
+NAMESPACE = "bench-retrieve"
+
+
+@pytest.fixture(scope="module")
+def populated_index(ultrasafe_server, pinecone_index, event_loop_runner):
+    chunks = []
+    for i in range(1000):
+        text = " ".join(page_lines(i, lines=6))
+        chunks.append(
+            Document(
+                page_content=text,
+                metadata={
+                    "chunk_id": make_chunk_id("corpus.txt", text),
+                    "filename": "corpus.txt",
+                    "page": i,
+                },
+            )
+        )
+    for start in range(0, len(chunks), 100):
+        event_loop_runner(process_batch(chunks[start : start + 100], pinecone_index, NAMESPACE))
+    return pinecone_index
+
+
+@pytest.mark.parametrize("candidates", [5, 50])
+def test_retrieve_relevant_chunks(benchmark, populated_index, event_loop_runner, candidates):
+    queries = (" ".join(random.Random(i).sample(WORDS, 4)) for i in range(10**6))
+
+    def retrieve():
+        return event_loop_runner(
+            retrieve_relevant_chunks(next(queries), NAMESPACE, top_k=5, candidates=candidates)
+        )
+
+    documents = benchmark(retrieve)
+    assert len(documents) == 5
+
+
+@pytest.mark.parametrize("count", [50, 1000])
+def test_reranker_sort(benchmark, count):
+    rng = random.Random(0)
+    data = {"result": {"data": [{"index": i, "score": rng.random()} for i in range(count)]}}
+    indices = benchmark(UltraSafeAIReranker._sorted_indices, data)
+    assert len(indices) == count
@@ -0,0 +1,27 @@
+import pytest
+from langchain_core.documents import Document
+
+from benchmarks.documents import page_lines
+from src.vectorstore.utils import clean_text
+from src.vectorstore.ingestion_pipeline import split_pages
+
+
+@pytest.mark.parametrize("pages", [1, 50])
+def test_clean_text(benchmark, pages):
+    text = "\n\n".join("  \t".join(page_lines(page)) for page in range(pages))
+    benchmark(clean_text, text)
+
+
+@pytest.mark.parametrize("pages", [1, 50])
+def test_split_pages(benchmark, pages):
+    text_pages = [" ".join(page_lines(page)) for page in range(pages)]
+
+    def split():
+        pages = (
+            Document(page_content=text, metadata={"page": i})
+            for i, text in enumerate(text_pages)
+        )
+        return list(split_pages(pages))
+
+    chunks = benchmark(split)
+    assert chunks
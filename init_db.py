@@ -1,10 +1,38 @@
+import asyncio
+from sqlalchemy import text
 from sqlmodel import SQLModel
 from src.models.user import User
+from src.models.job import IngestionJob
+from src.models.legacy_namespace import LegacyNamespace
+from src.models.namespace_generation import NamespaceGeneration
 from src.db.session import engine
+from src.db.migrations import add_job_columns, library_migration_pending, migrate_library_ids
+from src.config.vector_index import aget_vector_index, close_vector_index
+from src.config.chunk_store import chunk_store
+from src.config.document_manifest import document_manifest
 
-def init_db():
-    SQLModel.metadata.create_all(engine)
+
+async def list_stored_namespaces():
+    # Namespaces of earlier sessions may exist only in storage, without any job row.
+    index = await aget_vector_index()
+    namespaces = set(await index.list_namespaces())
+    namespaces |= set(await asyncio.to_thread(chunk_store.namespaces))
+    namespaces |= set(await asyncio.to_thread(document_manifest.namespaces))
+    await close_vector_index()
+    return namespaces
+
+async def init_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        # create_all does not add indexes to tables that already exist.
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_user_session_id ON \"user\" (session_id)"))
+        await conn.run_sync(add_job_columns)
+        stored_namespaces = set()
+        if await conn.run_sync(library_migration_pending):
+            stored_namespaces = await list_stored_namespaces()
+        await conn.run_sync(migrate_library_ids, stored_namespaces)
+    await engine.dispose()
     print("✅ Database initialized")
 
 if __name__ == "__main__":
-    init_db()
+    asyncio.run(init_db())
@@ -0,0 +1,57 @@
+import sys
+import asyncio
+from sqlmodel import select
+from src.models.legacy_namespace import LegacyNamespace
+from src.db.session import engine, async_session
+
+USAGE = """Usage:
+  python legacy_namespaces.py list
+  python legacy_namespaces.py release <namespace> [<namespace> ...]
+  python legacy_namespaces.py release --all
+
+Released namespaces are deleted by the next namespace garbage collection
+(unless NAMESPACE_GC_DRY_RUN is true)."""
+
+
+async def list_namespaces():
+    async with async_session() as db:
+        legacy = (await db.exec(select(LegacyNamespace).order_by(LegacyNamespace.recorded_at))).all()
+    for namespace in legacy:
+        print(
+            f"{namespace.namespace}  jobs={namespace.jobs}  last_upload={namespace.last_upload}  "
+            f"recorded_at={namespace.recorded_at}  {'released' if namespace.released else 'kept'}"
+        )
+    if not legacy:
+        print("No legacy namespaces recorded.")
+
+
+async def release(namespaces):
+    async with async_session() as db:
+        query = select(LegacyNamespace).where(LegacyNamespace.released.is_(False))
+        if namespaces is not None:
+            query = query.where(LegacyNamespace.namespace.in_(namespaces))
+        legacy = (await db.exec(query)).all()
+        for namespace in legacy:
+            namespace.released = True
+            db.add(namespace)
+        await db.commit()
+    print(f"✅ Released {len(legacy)} legacy namespaces")
+    if namespaces is not None:
+        missing = set(namespaces) - {namespace.namespace for namespace in legacy}
+        for namespace in sorted(missing):
+            print(f"⚠️ Not an unreleased legacy namespace: {namespace}")
+
+
+async def main(args):
+    if args == ["list"]:
+        await list_namespaces()
+    elif args == ["release", "--all"]:
+        await release(None)
+    elif len(args) > 1 and args[0] == "release":
+        await release(args[1:])
+    else:
+        print(USAGE)
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
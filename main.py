@@ -1,12 +1,50 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from src.api.routes import router as upload_router
+from src.api.documents import router as documents_router
 from src.api.auth import router as auth_router
+from src.api.stats import router as stats_router
+from src.api.metrics import router as metrics_router
+from src.api.health import router as health_router
 from src.middleware.session_middleware import SessionMiddleware
-from src.config.langfuse import langfuse
+from src.config.vector_index import close_vector_index
+from src.config.jobs import ingestion_queue
+from src.config.startup import warmup
+from src.config.namespace_gc import namespace_collector, NAMESPACE_GC_ENABLED
+from src.db.session import close_engine
+from src.config.security import password_hasher
+from src.config.upstream import upstream_client
+from src.vectorstore.http_client import close_async_http_client
+from src.vectorstore.loader import shutdown_process_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Clients are created lazily; warm them in the background so startup does not wait on the network.
+    await warmup.start()
+    await ingestion_queue.start()
+    if NAMESPACE_GC_ENABLED:
+        await namespace_collector.start()
+    yield
+    await namespace_collector.stop()
+    await warmup.stop()
+    await ingestion_queue.stop()
+    await close_vector_index()
+    await close_async_http_client()
+    upstream_client.close()
+    shutdown_process_pool()
+    await close_engine()
+    password_hasher.shutdown()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 
 app.include_router(auth_router)
 app.include_router(upload_router)
+app.include_router(documents_router)
+app.include_router(stats_router)
+app.include_router(metrics_router)
+app.include_router(health_router)
 app.add_middleware(SessionMiddleware)
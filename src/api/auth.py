@@ -1,43 +1,69 @@
 from fastapi import APIRouter, HTTPException, Depends, Response
-from sqlmodel import Session, select
-from passlib.context import CryptContext
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from src.models.user import User
 from src.db.session import get_session
+from src.config.session import session_cache
+from src.config.security import password_hasher
+from src.security.password_hasher import PasswordHasherBusy
 from src.schemas.auth import AuthLoginRequest, AuthSignupRequest
 from fastapi import Cookie
 
 router = APIRouter(prefix="/auth", tags=["auth"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Too many authentication requests, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
 
 
 @router.post("/signup")
-def signup(data: AuthSignupRequest, db: Session = Depends(get_session)):
+async def signup(data: AuthSignupRequest, db: AsyncSession = Depends(get_session)):
 
     if data.password != data.confirm_password:
         raise HTTPException(status_code=400, detail="Passwords do not match")
 
-    hashed = pwd_context.hash(data.password)
+    try:
+        hashed = await password_hasher.hash(data.password)
+    except PasswordHasherBusy:
+        raise hasher_busy()
     user = User(email=data.email, hashed_password=hashed)
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     return {"message": "User created", "user_id": user.id}
 
 
 @router.post("/login")
-def login(
-    data: AuthLoginRequest, response: Response, db: Session = Depends(get_session)
+async def login(
+    data: AuthLoginRequest, response: Response, db: AsyncSession = Depends(get_session)
 ):
-    user = db.exec(select(User).where(User.email == data.email)).first()
-    if not user or not pwd_context.verify(data.password, user.hashed_password):
+    user = (await db.exec(select(User).where(User.email == data.email))).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    try:
+        valid, new_hash = await password_hasher.verify_and_update(
+            data.password, user.hashed_password
+        )
+    except PasswordHasherBusy:
+        raise hasher_busy()
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     from uuid import uuid4
 
+    previous_session_id = user.session_id
     user.session_id = str(uuid4())
+    if new_hash:
+        # Stored hash used an older cost factor; upgrade it while the password is at hand.
+        user.hashed_password = new_hash
     db.add(user)
-    db.commit()
+    await db.commit()
+    session_cache.invalidate(previous_session_id)
 
     response.set_cookie(
         key="session_id",
@@ -51,15 +77,15 @@ def login(
 
 
 @router.post("/logout")
-def logout(
+async def logout(
     response: Response,
     session_id: str = Cookie(default=None),
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_session),
 ):
     if not session_id:
         raise HTTPException(status_code=400, detail="No session ID found")
 
-    user = db.exec(select(User).where(User.session_id == session_id)).first()
+    user = (await db.exec(select(User).where(User.session_id == session_id))).first()
     if not user:
         raise HTTPException(
             status_code=401, detail="Invalid session or already logged out"
@@ -67,7 +93,8 @@ def logout(
 
     user.session_id = None
     db.add(user)
-    db.commit()
+    await db.commit()
+    session_cache.invalidate(session_id)
 
     response.delete_cookie(key="session_id")
 
@@ -0,0 +1,86 @@
+import asyncio
+
+from fastapi import APIRouter, UploadFile, File, Request, HTTPException
+
+from src.api.routes import store_upload
+from src.config.document_manifest import document_manifest
+from src.config.jobs import ingestion_queue
+from src.dependencies import get_current_user
+
+
+router = APIRouter(tags=["Document"])
+
+
+async def get_owned_document(request: Request, document_id: str) -> dict:
+    user = get_current_user(request)
+    document = await asyncio.to_thread(document_manifest.get, document_id)
+    if not document or document["namespace"] != user.library_id:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return document
+
+
+def document_response(document: dict) -> dict:
+    return {
+        "document_id": document["id"],
+        "filename": document["filename"],
+        "status": document["status"],
+        "chunks": document["chunks"],
+        "content_hash": document["content_hash"],
+        "created_at": document["created_at"],
+        "updated_at": document["updated_at"],
+    }
+
+
+@router.get("/documents")
+async def list_documents(request: Request):
+    user = get_current_user(request)
+    documents = await asyncio.to_thread(document_manifest.list, user.library_id)
+    return {"documents": [document_response(document) for document in documents]}
+
+
+@router.delete("/documents/{document_id}")
+async def remove_document(request: Request, document_id: str):
+    """
+
+    Delete a document's chunks by the IDs recorded for it, without touching the rest of the namespace.
+    The deletion runs as a job, after any ingestion of the document that is queued or running.
+
+    """
+
+    document = await get_owned_document(request, document_id)
+    job = await ingestion_queue.submit_delete(
+        namespace=document["namespace"], filename=document["filename"]
+    )
+    return {
+        "message": "Document deletion queued",
+        "document_id": document_id,
+        "job_id": job.id,
+        "status": job.status,
+    }
+
+
+@router.put("/documents/{document_id}")
+async def replace_document(request: Request, document_id: str, file: UploadFile = File(...)):
+    """
+
+    Replace a document with a new file. The new version is ingested under the document's
+    filename; its unchanged chunks are reused and the chunks it no longer has are deleted.
+
+    """
+
+    document = await get_owned_document(request, document_id)
+    if document["status"] == "ingesting":
+        raise HTTPException(status_code=409, detail="Document is being ingested")
+
+    stored_filename = await store_upload(file)
+    job = await ingestion_queue.submit(
+        namespace=document["namespace"],
+        filename=document["filename"],
+        file_path=stored_filename,
+    )
+    return {
+        "message": "Document replacement queued for processing",
+        "document_id": document_id,
+        "job_id": job.id,
+        "status": job.status,
+    }
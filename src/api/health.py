@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from src.config.startup import warmup
+
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/healthz")
+async def liveness():
+    """
+
+    Liveness probe: the process is up and serving requests.
+
+    """
+
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readiness():
+    """
+
+    Readiness probe: 200 once the database, vector index and API clients have warmed up,
+    503 with the state of each component until then.
+
+    """
+
+    stats = warmup.stats()
+    return JSONResponse(
+        {"status": "ready" if stats["ready"] else "starting", **stats},
+        status_code=200 if stats["ready"] else 503,
+    )
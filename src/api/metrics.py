@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from src.config.metrics import metrics
+from src.dependencies import require_metrics_access
+
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", dependencies=[Depends(require_metrics_access)])
+async def get_metrics():
+    """
+
+    Per-stage latency histograms and upstream counters in the Prometheus text format.
+
+    """
+
+    return Response(metrics.export(), media_type=CONTENT_TYPE_LATEST)
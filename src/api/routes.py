@@ -1,66 +1,177 @@
 from fastapi import APIRouter, UploadFile, File, Request, HTTPException
+from fastapi.responses import StreamingResponse
 import os
+import json
+import asyncio
 import shutil
 import uuid
 
-from src.vectorstore.ingestion_pipeline import process_and_store
-from src.vectorstore.retriver import retrieve_relevant_chunks
-from src.vectorstore.generator import generate_answer_with_ultrasafeai
+from src.vectorstore.retriver import retrieve_relevant_chunks, embed_query
+from src.vectorstore.generator import (
+    generate_answer_with_ultrasafeai,
+    stream_answer_with_ultrasafeai,
+)
 
 from langfuse import observe
-from src.config.langfuse import langfuse
+from src.config.answer_cache import answer_cache, answer_generation
+from src.config.jobs import ingestion_queue, UPLOAD_DIR
 
 from src.schemas.query import QueryRequest
+from src.dependencies import get_current_user
+from src.vectorstore.upstream import UpstreamUnavailable
 
 
 router = APIRouter(tags=["Document"])
 
 
-@observe(name="upload_doc")
-@router.post("/upload")
-async def upload_doc(request: Request, file: UploadFile = File(...)):
-    user = request.state.user
-    session_id = user.session_id
-    if not session_id:
-        raise HTTPException(status_code=400, detail="Missing session ID")
+def copy_upload(source, stored_filename: str):
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    with open(stored_filename, "wb") as f:
+        shutil.copyfileobj(source, f)
 
+
+async def store_upload(file: UploadFile) -> str:
     ext = os.path.splitext(file.filename)[1].lower()
     if ext not in [".pdf", ".doc", ".docx", ".txt"]:
         raise HTTPException(status_code=400, detail="Unsupported file type")
 
-    temp_filename = f"temp_{uuid.uuid4()}{ext}"
-    with open(temp_filename, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+    # The file must outlive the request, since it is processed by a background job. Large
+    # uploads are copied in a worker thread so that the event loop keeps serving requests.
+    stored_filename = os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}{ext}")
+    await asyncio.to_thread(copy_upload, file.file, stored_filename)
+    return stored_filename
 
-    try:
-        process_and_store(
-            file_path=temp_filename, filename=file.filename, session_id=session_id
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        os.remove(temp_filename)
 
-    return {"message": "Document processed and stored successfully"}
+@observe(name="upload_doc")
+@router.post("/upload")
+async def upload_doc(request: Request, file: UploadFile = File(...)):
+    user = get_current_user(request)
+    library_id = user.library_id
+
+    stored_filename = await store_upload(file)
+
+    job = await ingestion_queue.submit(
+        namespace=library_id, filename=file.filename, file_path=stored_filename
+    )
+
+    return {
+        "message": "Document queued for processing",
+        "job_id": job.id,
+        "status": job.status,
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(request: Request, job_id: str):
+    user = get_current_user(request)
+    job = await ingestion_queue.get(job_id)
+    if not job or job.namespace != user.library_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return {
+        "job_id": job.id,
+        "filename": job.filename,
+        "action": job.action,
+        "status": job.status,
+        "chunks_total": job.chunks_total,
+        "chunks_embedded": job.chunks_embedded,
+        "chunks_reused": job.chunks_reused,
+        "batches_upserted": job.batches_upserted,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
 
 
 @observe(name="query_docs")
 @router.post("/query")
 async def query_docs(request: Request, data: QueryRequest):
-    user = request.state.user
-    session_id = user.session_id
-
-    if not session_id:
-        raise HTTPException(status_code=400, detail="Missing session ID")
+    user = get_current_user(request)
+    library_id = user.library_id
 
     query = data.query
     try:
-        docs = retrieve_relevant_chunks(query, session_id=session_id)
-        answer = generate_answer_with_ultrasafeai(query, docs)
+        generation = await answer_generation(library_id)
+        embedded_query = await embed_query(query)
+        cached_answer = answer_cache.lookup(library_id, embedded_query, generation)
+        if cached_answer is not None:
+            return {"query": query, "answer": cached_answer, "cached": True, "prompt_tokens": 0}
+
+        docs = await retrieve_relevant_chunks(
+            query, namespace=library_id, embedded_query=embedded_query
+        )
+        usage = {}
+        answer = await generate_answer_with_ultrasafeai(query, docs, usage=usage)
+        answer_cache.store(library_id, query, embedded_query, answer, generation)
 
         return {
             "query": query,
             "answer": answer,
+            "cached": False,
+            "prompt_tokens": usage["prompt_tokens"],
         }
+    except UpstreamUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def sse_event(data: dict, event: str = None) -> str:
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data)}\n\n"
+
+
+@router.post("/query/stream")
+async def query_docs_stream(request: Request, data: QueryRequest):
+    """
+    Answer a query as a server-sent-event stream: one "data" event per generated token,
+    then a "done" event, or an "error" event if generation fails midway.
+
+    """
+    user = get_current_user(request)
+    library_id = user.library_id
+
+    query = data.query
+    try:
+        generation = await answer_generation(library_id)
+        embedded_query = await embed_query(query)
+        cached_answer = answer_cache.lookup(library_id, embedded_query, generation)
+        docs = None
+        if cached_answer is None:
+            docs = await retrieve_relevant_chunks(
+                query, namespace=library_id, embedded_query=embedded_query
+            )
+    except UpstreamUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    async def event_stream():
+        if cached_answer is not None:
+            yield sse_event({"token": cached_answer})
+            yield sse_event(
+                {"query": query, "cached": True, "prompt_tokens": 0}, event="done"
+            )
+            return
+
+        try:
+            tokens = []
+            usage = {}
+            async for token in stream_answer_with_ultrasafeai(query, docs, usage=usage):
+                tokens.append(token)
+                yield sse_event({"token": token})
+            answer_cache.store(
+                library_id, query, embedded_query, "".join(tokens), generation
+            )
+            yield sse_event(
+                {"query": query, "cached": False, "prompt_tokens": usage["prompt_tokens"]},
+                event="done",
+            )
+        except Exception as e:
+            yield sse_event({"detail": str(e)}, event="error")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends
+
+from src.config.security import password_hasher
+from src.config.session import session_cache
+from src.config.embedding import get_query_embedding_batcher, get_embedding_cache
+from src.config.reranker import get_rerank_batcher
+from src.config.answer_cache import answer_cache
+from src.config.upstream import upstream_client
+from src.config.bulk_upsert import bulk_upserter
+from src.config.namespace_gc import namespace_collector
+from src.dependencies import require_metrics_access
+
+
+router = APIRouter(tags=["Stats"])
+
+
+@router.get("/stats", dependencies=[Depends(require_metrics_access)])
+async def get_stats():
+    """
+
+    Runtime counters of the in-process executors and caches.
+
+    """
+
+    query_embedding_batcher = get_query_embedding_batcher()
+    rerank_batcher = get_rerank_batcher()
+    embedding_cache = get_embedding_cache()
+    return {
+        "password_hasher": password_hasher.stats(),
+        "session_cache": session_cache.stats(),
+        "query_embedding_batcher": query_embedding_batcher.stats() if query_embedding_batcher else None,
+        "rerank_batcher": rerank_batcher.stats() if rerank_batcher else None,
+        "embedding_cache": embedding_cache.stats() if embedding_cache else None,
+        "answer_cache": answer_cache.stats(),
+        "upstream_breakers": upstream_client.stats(),
+        "bulk_upserter": bulk_upserter.stats(),
+        "namespace_gc": namespace_collector.stats(),
+    }
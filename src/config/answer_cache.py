@@ -0,0 +1,41 @@
+import os
+from dotenv import load_dotenv
+
+from src.vectorstore.answer_cache import SemanticAnswerCache
+from src.db.generations import NamespaceGenerations
+from src.db.session import async_session
+
+
+load_dotenv()
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "100"))
+
+
+answer_cache = SemanticAnswerCache(
+    similarity_threshold=ANSWER_CACHE_SIMILARITY,
+    ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+    max_entries_per_namespace=ANSWER_CACHE_MAX_ENTRIES,
+    enabled=ANSWER_CACHE_ENABLED,
+)
+
+# Generations live in the database, so that all backend workers see each other's invalidations.
+namespace_generations = NamespaceGenerations(async_session)
+
+
+async def answer_generation(namespace: str) -> int:
+    if not answer_cache.enabled:
+        return 0
+    return await namespace_generations.get(namespace)
+
+
+async def invalidate_answers(namespace: str):
+    """
+
+    Drop the cached answers of a namespace in every backend worker.
+
+    """
+
+    answer_cache.invalidate(namespace, await namespace_generations.bump(namespace))
@@ -0,0 +1,24 @@
+import os
+from dotenv import load_dotenv
+
+from src.vectorstore.bulk_upsert import BulkUpserter
+
+
+load_dotenv()
+
+# Pinecone rejects upsert requests over 2 MB or 1000 vectors; the default leaves headroom.
+UPSERT_MAX_REQUEST_BYTES = int(os.getenv("UPSERT_MAX_REQUEST_BYTES", "1800000"))
+UPSERT_MAX_VECTORS_PER_REQUEST = int(os.getenv("UPSERT_MAX_VECTORS_PER_REQUEST", "1000"))
+# Upsert requests in flight across all ingestion jobs, tuned separately from embedding.
+UPSERT_CONCURRENCY = int(os.getenv("UPSERT_CONCURRENCY", "8"))
+UPSERT_MAX_RETRIES = int(os.getenv("UPSERT_MAX_RETRIES", "3"))
+UPSERT_BACKOFF_BASE = float(os.getenv("UPSERT_BACKOFF_BASE", "0.5"))
+
+
+bulk_upserter = BulkUpserter(
+    max_request_bytes=UPSERT_MAX_REQUEST_BYTES,
+    max_vectors_per_request=UPSERT_MAX_VECTORS_PER_REQUEST,
+    concurrency=UPSERT_CONCURRENCY,
+    max_retries=UPSERT_MAX_RETRIES,
+    backoff_base=UPSERT_BACKOFF_BASE,
+)
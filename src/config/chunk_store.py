@@ -0,0 +1,14 @@
+import os
+from dotenv import load_dotenv
+
+from src.vectorstore.chunk_store import ChunkStore
+
+
+load_dotenv()
+
+CHUNK_STORE_PATH = os.getenv("CHUNK_STORE_PATH", ".cache/chunks.db")
+HYBRID_SEARCH_ENABLED = os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true"
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+
+chunk_store = ChunkStore(path=CHUNK_STORE_PATH)
@@ -0,0 +1,19 @@
+import os
+from dotenv import load_dotenv
+
+from src.vectorstore.context_packer import ContextPacker, TokenCounter
+
+
+load_dotenv()
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+CONTEXT_TOKEN_ENCODING = os.getenv("CONTEXT_TOKEN_ENCODING", "cl100k_base")
+CONTEXT_DUPLICATE_THRESHOLD = float(os.getenv("CONTEXT_DUPLICATE_THRESHOLD", "0.9"))
+
+
+token_counter = TokenCounter(encoding_name=CONTEXT_TOKEN_ENCODING)
+context_packer = ContextPacker(
+    token_budget=CONTEXT_TOKEN_BUDGET,
+    duplicate_threshold=CONTEXT_DUPLICATE_THRESHOLD,
+    counter=token_counter,
+)
@@ -0,0 +1,14 @@
+import os
+from dotenv import load_dotenv
+
+from src.vectorstore.document_manifest import DocumentManifest
+
+
+load_dotenv()
+
+DOCUMENT_MANIFEST_PATH = os.getenv("DOCUMENT_MANIFEST_PATH", ".cache/documents.db")
+# Vector IDs per delete request; Pinecone accepts at most 1000.
+DELETE_BATCH_SIZE = int(os.getenv("DELETE_BATCH_SIZE", "1000"))
+
+
+document_manifest = DocumentManifest(path=DOCUMENT_MANIFEST_PATH)
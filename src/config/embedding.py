@@ -1,7 +1,12 @@
 import os
+import threading
 from dotenv import load_dotenv
 
 from src.vectorstore.ultrasafe_embeddings import UltraSafeAIEmbeddings
+from src.vectorstore.embedding_cache import CachedEmbeddings, EmbeddingCache
+from src.vectorstore.micro_batcher import BatchedQueryEmbeddings
+from src.config.upstream import upstream_client
+from src.config.batching import MICRO_BATCH_ENABLED, MICRO_BATCH_WINDOW_MS, MICRO_BATCH_MAX_SIZE
 
 
 load_dotenv()
@@ -11,10 +16,67 @@ ULTRASAFE_API_EMBEDDINGS_BASE = os.getenv(
     "ULTRASAFE_API_EMBEDDINGS_BASE", "https://api.us.inc/usf/v1/embed/embeddings"
 )
 ULTRASAFE_MODEL = os.getenv("ULTRASAFE_MODEL", "usf1-embed")
+EMBEDDING_MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "64"))
+EMBEDDING_MAX_BATCH_TOKENS = int(os.getenv("EMBEDDING_MAX_BATCH_TOKENS", "8000"))
 
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.db")
+EMBEDDING_CACHE_MEMORY_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", "10000"))
+EMBEDDING_CACHE_MAX_DISK_MB = int(os.getenv("EMBEDDING_CACHE_MAX_DISK_MB", "512"))
 
-embedding_instance = UltraSafeAIEmbeddings(
-    api_key=ULTRASAFE_API_KEY,
-    api_url=ULTRASAFE_API_EMBEDDINGS_BASE,
-    model=ULTRASAFE_MODEL,
-)
+
+_lock = threading.Lock()
+_embedding_instance = None
+_query_embedding_batcher = None
+_embedding_cache = None
+
+
+def get_embedding_instance():
+    """
+
+    Return the shared embeddings client, wrapped in the micro-batcher and the embedding cache
+    as configured. It is built on first use; the startup warmup builds it ahead of requests.
+
+    """
+
+    global _embedding_instance, _query_embedding_batcher, _embedding_cache
+    if _embedding_instance is None:
+        with _lock:
+            if _embedding_instance is None:
+                instance = UltraSafeAIEmbeddings(
+                    api_key=ULTRASAFE_API_KEY,
+                    api_url=ULTRASAFE_API_EMBEDDINGS_BASE,
+                    model=ULTRASAFE_MODEL,
+                    max_batch_size=EMBEDDING_MAX_BATCH_SIZE,
+                    max_batch_tokens=EMBEDDING_MAX_BATCH_TOKENS,
+                    upstream=upstream_client,
+                )
+
+                if MICRO_BATCH_ENABLED:
+                    instance = BatchedQueryEmbeddings(
+                        instance,
+                        max_batch_size=MICRO_BATCH_MAX_SIZE,
+                        max_wait_ms=MICRO_BATCH_WINDOW_MS,
+                    )
+                    _query_embedding_batcher = instance.batcher
+
+                if EMBEDDING_CACHE_ENABLED:
+                    _embedding_cache = EmbeddingCache(
+                        path=EMBEDDING_CACHE_PATH,
+                        max_memory_entries=EMBEDDING_CACHE_MEMORY_ENTRIES,
+                        max_disk_bytes=EMBEDDING_CACHE_MAX_DISK_MB * 1024 * 1024,
+                    )
+                    instance = CachedEmbeddings(instance, _embedding_cache)
+
+                _embedding_instance = instance
+    return _embedding_instance
+
+
+def get_query_embedding_batcher():
+    get_embedding_instance()
+    return _query_embedding_batcher
+
+
+def get_embedding_cache():
+    get_embedding_instance()
+    return _embedding_cache
@@ -0,0 +1,23 @@
+import os
+from dotenv import load_dotenv
+
+from src.db.session import async_session
+from src.jobs.ingestion_queue import IngestionJobQueue
+
+
+load_dotenv()
+
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+# A running job's lease is renewed every third of this; a job whose process died is resumed
+# elsewhere once its lease has expired. Workers look for jobs from other processes every poll.
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+UPLOAD_DIR = os.path.abspath(os.getenv("UPLOAD_DIR", "uploads"))
+
+
+ingestion_queue = IngestionJobQueue(
+    session_factory=async_session,
+    workers=INGESTION_WORKERS,
+    lease_seconds=JOB_LEASE_SECONDS,
+    poll_seconds=JOB_POLL_SECONDS,
+)
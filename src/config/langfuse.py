@@ -1,12 +1,28 @@
 from langfuse import Langfuse
 from dotenv import load_dotenv
 import os
+import threading
 
 load_dotenv()
 
+_lock = threading.Lock()
+_langfuse = None
 
-langfuse = Langfuse(
-    secret_key=os.getenv("LANGFUSE_SECRET_KEY"),
-    public_key=os.getenv("LANGFUSE_PUBLIC_KEY"),
-    host=os.getenv("LANGFUSE_HOST", "https://us.cloud.langfuse.com"),
-)
+
+def get_langfuse() -> Langfuse:
+    """
+
+    Return the Langfuse client, created on first use. Once it exists, @observe reports to it.
+
+    """
+
+    global _langfuse
+    if _langfuse is None:
+        with _lock:
+            if _langfuse is None:
+                _langfuse = Langfuse(
+                    secret_key=os.getenv("LANGFUSE_SECRET_KEY"),
+                    public_key=os.getenv("LANGFUSE_PUBLIC_KEY"),
+                    host=os.getenv("LANGFUSE_HOST", "https://us.cloud.langfuse.com"),
+                )
+    return _langfuse
@@ -0,0 +1,17 @@
+import os
+from dotenv import load_dotenv
+
+from src.vectorstore.metrics import StageMetrics
+
+
+load_dotenv()
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Also emit an OpenTelemetry span per stage, for the tracer provider configured in the process.
+METRICS_OTEL_SPANS = os.getenv("METRICS_OTEL_SPANS", "false").lower() == "true"
+# Bearer token accepted by /metrics and /stats, e.g. for a Prometheus scraper. Without it,
+# those endpoints are only served to logged-in users.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+metrics = StageMetrics(enabled=METRICS_ENABLED, otel_spans=METRICS_OTEL_SPANS)
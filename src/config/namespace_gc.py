@@ -0,0 +1,35 @@
+import os
+from dotenv import load_dotenv
+
+from src.db.session import async_session
+from src.jobs.namespace_gc import NamespaceCollector
+from src.config.vector_index import aget_vector_index
+from src.config.chunk_store import chunk_store
+from src.config.document_manifest import document_manifest
+
+
+load_dotenv()
+
+NAMESPACE_GC_ENABLED = os.getenv("NAMESPACE_GC_ENABLED", "true").lower() == "true"
+NAMESPACE_GC_INTERVAL_SECONDS = float(os.getenv("NAMESPACE_GC_INTERVAL_SECONDS", "3600"))
+NAMESPACE_GC_CONCURRENCY = int(os.getenv("NAMESPACE_GC_CONCURRENCY", "4"))
+# Only report orphaned namespaces in /stats and the log, without deleting them. On by default,
+# so that deletion is only enabled after the reported namespaces have been reviewed.
+NAMESPACE_GC_DRY_RUN = os.getenv("NAMESPACE_GC_DRY_RUN", "true").lower() == "true"
+# Days after which a legacy namespace that was not released is collected anyway; unset keeps
+# legacy namespaces until they are released with legacy_namespaces.py.
+LEGACY_NAMESPACE_RETENTION_DAYS = os.getenv("LEGACY_NAMESPACE_RETENTION_DAYS")
+
+
+namespace_collector = NamespaceCollector(
+    session_factory=async_session,
+    index_factory=aget_vector_index,
+    chunk_store=chunk_store,
+    document_manifest=document_manifest,
+    interval_seconds=NAMESPACE_GC_INTERVAL_SECONDS,
+    concurrency=NAMESPACE_GC_CONCURRENCY,
+    dry_run=NAMESPACE_GC_DRY_RUN,
+    legacy_retention_days=(
+        float(LEGACY_NAMESPACE_RETENTION_DAYS) if LEGACY_NAMESPACE_RETENTION_DAYS else None
+    ),
+)
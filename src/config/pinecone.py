@@ -1,6 +1,7 @@
 import os
+import threading
 from dotenv import load_dotenv
-from src.vectorstore.pinecone_client import get_pinecone_index
+from src.vectorstore.pinecone_client import ensure_pinecone_index, get_async_pinecone_index
 
 
 load_dotenv()
@@ -11,11 +12,48 @@ PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX")
 PINECONE_REGION = os.getenv("PINECONE_REGION", "us-east-1")
 PINECONE_CLOUD = os.getenv("PINECONE_CLOUD", "aws")
 
+_lock = threading.Lock()
+_index_host = None
+_async_index = None
 
-index = get_pinecone_index(
-    api_key=PINECONE_API_KEY,
-    index_name=PINECONE_INDEX_NAME,
-    region=PINECONE_REGION,
-    cloud=PINECONE_CLOUD,
-    dimension=1024,
-)
+
+def get_index_host() -> str:
+    """
+
+    Resolve the host of the Pinecone index once per process, creating the index if it does not
+    exist. This blocks on the Pinecone control plane, so the startup warmup runs it in a thread.
+
+    """
+
+    global _index_host
+    if _index_host is None:
+        with _lock:
+            if _index_host is None:
+                _index_host = ensure_pinecone_index(
+                    api_key=PINECONE_API_KEY,
+                    index_name=PINECONE_INDEX_NAME,
+                    region=PINECONE_REGION,
+                    cloud=PINECONE_CLOUD,
+                    dimension=1024,
+                )
+    return _index_host
+
+
+def get_async_index():
+    """
+
+    Return the shared asyncio Pinecone index, created on first use inside the running event loop.
+
+    """
+
+    global _async_index
+    if _async_index is None:
+        _async_index = get_async_pinecone_index(api_key=PINECONE_API_KEY, host=get_index_host())
+    return _async_index
+
+
+async def close_async_index():
+    global _async_index
+    if _async_index is not None:
+        await _async_index.close()
+        _async_index = None
@@ -1,9 +1,50 @@
 from src.vectorstore.ultrasafe_reranker import UltraSafeAIReranker
+from src.vectorstore.micro_batcher import BatchedReranker
+from src.config.upstream import upstream_client
+from src.config.batching import MICRO_BATCH_ENABLED, MICRO_BATCH_WINDOW_MS, MICRO_BATCH_MAX_SIZE
 import os
+import threading
 from dotenv import load_dotenv
 
 
 load_dotenv()
 
 ULTRASAFE_API_KEY = os.getenv("ULTRASAFE_API_KEY")  
-reranker_instance = UltraSafeAIReranker(api_key=ULTRASAFE_API_KEY)
+ULTRASAFE_RERANKER_URL = os.getenv(
+    "ULTRASAFE_RERANKER_URL", "https://api.us.inc/usf/v1/embed/reranker"
+)
+_lock = threading.Lock()
+_reranker_instance = None
+_rerank_batcher = None
+
+
+def get_reranker_instance():
+    """
+
+    Return the shared reranker client, wrapped in the micro-batcher if enabled, built on first use.
+
+    """
+
+    global _reranker_instance, _rerank_batcher
+    if _reranker_instance is None:
+        with _lock:
+            if _reranker_instance is None:
+                instance = UltraSafeAIReranker(
+                    api_key=ULTRASAFE_API_KEY,
+                    api_url=ULTRASAFE_RERANKER_URL,
+                    upstream=upstream_client,
+                )
+                if MICRO_BATCH_ENABLED:
+                    instance = BatchedReranker(
+                        instance,
+                        max_batch_size=MICRO_BATCH_MAX_SIZE,
+                        max_wait_ms=MICRO_BATCH_WINDOW_MS,
+                    )
+                    _rerank_batcher = instance.batcher
+                _reranker_instance = instance
+    return _reranker_instance
+
+
+def get_rerank_batcher():
+    get_reranker_instance()
+    return _rerank_batcher
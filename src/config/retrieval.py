@@ -0,0 +1,13 @@
+import os
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+# Chunks returned to the generator after reranking.
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "5"))
+# Candidates fetched from each search stage and passed to the reranker; set equal to
+# RETRIEVAL_TOP_K to rerank only the final results.
+RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", "50"))
+# Also copy chunk text into vector metadata (needed only by external readers of the index).
+VECTOR_METADATA_TEXT = os.getenv("VECTOR_METADATA_TEXT", "false").lower() == "true"
@@ -0,0 +1,18 @@
+import os
+from dotenv import load_dotenv
+
+from src.security.password_hasher import PasswordHasher
+
+
+load_dotenv()
+
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+
+password_hasher = PasswordHasher(
+    rounds=PASSWORD_HASH_ROUNDS,
+    max_workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,24 @@
+import os
+from dotenv import load_dotenv
+
+from src.middleware.session_cache import SessionCache
+
+
+load_dotenv()
+
+SESSION_CACHE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_TTL_SECONDS", "60"))
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "10000"))
+# Path prefixes served without resolving the session cookie.
+SESSION_PUBLIC_PATHS = [
+    path.strip()
+    for path in os.getenv(
+        "SESSION_PUBLIC_PATHS", "/auth/signup,/auth/login,/docs,/redoc,/openapi.json,/healthz,/readyz"
+    ).split(",")
+    if path.strip()
+]
+
+
+session_cache = SessionCache(
+    ttl_seconds=SESSION_CACHE_TTL_SECONDS,
+    max_entries=SESSION_CACHE_MAX_ENTRIES,
+)
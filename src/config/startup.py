@@ -0,0 +1,52 @@
+import os
+import asyncio
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+from src.jobs.warmup import Warmup
+from src.db.session import engine
+from src.config.vector_index import warm_vector_index
+from src.config.embedding import get_embedding_instance
+from src.config.reranker import get_reranker_instance
+from src.config.langfuse import get_langfuse
+from src.config.context import token_counter
+
+
+load_dotenv()
+
+STARTUP_WARMUP_RETRY_SECONDS = float(os.getenv("STARTUP_WARMUP_RETRY_SECONDS", "5"))
+
+
+async def warm_database():
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def warm_embeddings():
+    await asyncio.to_thread(get_embedding_instance)
+
+
+async def warm_reranker():
+    await asyncio.to_thread(get_reranker_instance)
+
+
+async def warm_token_counter():
+    # Loading the encoding may download its BPE file; it must not happen on the first request.
+    await asyncio.to_thread(lambda: token_counter.encoding)
+
+
+async def warm_langfuse():
+    await asyncio.to_thread(get_langfuse)
+
+
+warmup = Warmup(
+    components={
+        "database": warm_database,
+        "vector_index": warm_vector_index,
+        "embeddings": warm_embeddings,
+        "reranker": warm_reranker,
+        "langfuse": warm_langfuse,
+        "token_counter": warm_token_counter,
+    },
+    retry_seconds=STARTUP_WARMUP_RETRY_SECONDS,
+)
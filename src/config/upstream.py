@@ -0,0 +1,34 @@
+import os
+from dotenv import load_dotenv
+
+from src.vectorstore.upstream import UpstreamClient
+from src.config.metrics import metrics
+
+
+load_dotenv()
+
+UPSTREAM_TIMEOUT_EMBEDDINGS = float(os.getenv("UPSTREAM_TIMEOUT_EMBEDDINGS", "30"))
+UPSTREAM_TIMEOUT_RERANKER = float(os.getenv("UPSTREAM_TIMEOUT_RERANKER", "30"))
+UPSTREAM_TIMEOUT_CHAT = float(os.getenv("UPSTREAM_TIMEOUT_CHAT", "120"))
+UPSTREAM_MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", "3"))
+UPSTREAM_BACKOFF_BASE = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.5"))
+UPSTREAM_BACKOFF_MAX = float(os.getenv("UPSTREAM_BACKOFF_MAX", "10"))
+UPSTREAM_BREAKER_THRESHOLD = int(os.getenv("UPSTREAM_BREAKER_THRESHOLD", "5"))
+UPSTREAM_BREAKER_RESET_SECONDS = float(os.getenv("UPSTREAM_BREAKER_RESET_SECONDS", "30"))
+UPSTREAM_POOL_MAXSIZE = int(os.getenv("UPSTREAM_POOL_MAXSIZE", "50"))
+
+
+upstream_client = UpstreamClient(
+    timeouts={
+        "embeddings": UPSTREAM_TIMEOUT_EMBEDDINGS,
+        "reranker": UPSTREAM_TIMEOUT_RERANKER,
+        "chat": UPSTREAM_TIMEOUT_CHAT,
+    },
+    max_retries=UPSTREAM_MAX_RETRIES,
+    backoff_base=UPSTREAM_BACKOFF_BASE,
+    backoff_max=UPSTREAM_BACKOFF_MAX,
+    breaker_threshold=UPSTREAM_BREAKER_THRESHOLD,
+    breaker_reset_seconds=UPSTREAM_BREAKER_RESET_SECONDS,
+    pool_maxsize=UPSTREAM_POOL_MAXSIZE,
+    metrics=metrics,
+)
@@ -0,0 +1,75 @@
+import os
+import asyncio
+from dotenv import load_dotenv
+
+from src.vectorstore.vector_index import PineconeVectorIndex, VectorIndex
+from src.vectorstore.local_index import LocalVectorIndex
+
+
+load_dotenv()
+
+# "pinecone" uses the remote index from src.config.pinecone, "local" the in-process NumPy index.
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone").lower()
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", ".cache/vector_index")
+LOCAL_INDEX_ANN_MIN_VECTORS = int(os.getenv("LOCAL_INDEX_ANN_MIN_VECTORS", "50000"))
+LOCAL_INDEX_NPROBE = int(os.getenv("LOCAL_INDEX_NPROBE", "8"))
+
+_vector_index = None
+
+
+def get_vector_index() -> VectorIndex:
+    """
+
+    Return the configured vector index backend, created on first use.
+
+    """
+
+    global _vector_index
+    if _vector_index is None:
+        if VECTOR_BACKEND == "local":
+            _vector_index = LocalVectorIndex(
+                base_dir=LOCAL_INDEX_DIR,
+                ann_min_vectors=LOCAL_INDEX_ANN_MIN_VECTORS,
+                nprobe=LOCAL_INDEX_NPROBE,
+            )
+        elif VECTOR_BACKEND == "pinecone":
+            # Imported here so that the local backend never connects to Pinecone.
+            from src.config.pinecone import get_async_index
+
+            _vector_index = PineconeVectorIndex(get_async_index())
+        else:
+            raise ValueError(f"Unsupported vector backend: {VECTOR_BACKEND}")
+    return _vector_index
+
+
+async def aget_vector_index() -> VectorIndex:
+    """
+
+    Return the configured vector index backend from async code. Until it exists, the blocking
+    Pinecone index lookup (and creation, if the index is missing) runs in a worker thread, so a
+    request arriving before the startup warmup has finished never blocks the event loop.
+
+    """
+
+    if _vector_index is None and VECTOR_BACKEND == "pinecone":
+        from src.config.pinecone import get_index_host
+
+        await asyncio.to_thread(get_index_host)
+    return get_vector_index()
+
+
+async def warm_vector_index():
+    """
+
+    Create the vector index ahead of the first request.
+
+    """
+
+    await aget_vector_index()
+
+
+async def close_vector_index():
+    global _vector_index
+    if _vector_index is not None:
+        await _vector_index.close()
+        _vector_index = None
@@ -0,0 +1,50 @@
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from src.models.namespace_generation import NamespaceGeneration
+
+
+class NamespaceGenerations:
+    """
+
+    Per-namespace generation counters kept in the shared database, so that an invalidation made
+    by one backend worker is seen by all of them.
+
+    """
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+
+    async def get(self, namespace: str) -> int:
+        async with self.session_factory() as db:
+            row = await db.get(NamespaceGeneration, namespace)
+            return row.generation if row else 0
+
+    async def bump(self, namespace: str) -> int:
+        """
+
+        Increment the namespace's generation atomically and return the new value.
+
+        """
+
+        for _ in range(3):
+            async with self.session_factory() as db:
+                generation = (
+                    await db.exec(
+                        update(NamespaceGeneration)
+                        .where(NamespaceGeneration.namespace == namespace)
+                        .values(generation=NamespaceGeneration.generation + 1)
+                        .returning(NamespaceGeneration.generation)
+                    )
+                ).scalar_one_or_none()
+                if generation is not None:
+                    await db.commit()
+                    return generation
+                db.add(NamespaceGeneration(namespace=namespace, generation=1))
+                try:
+                    await db.commit()
+                    return 1
+                except IntegrityError:
+                    # Another worker created the row first; increment it instead.
+                    await db.rollback()
+        raise RuntimeError(f"Could not bump the generation of namespace {namespace}")
@@ -0,0 +1,122 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+
+# Columns added to the job table after it was first created, with their SQL definitions.
+JOB_COLUMNS = {
+    "chunks_reused": "INTEGER NOT NULL DEFAULT 0",
+    "owner": "VARCHAR",
+    "lease_expires_at": "TIMESTAMP",
+    "action": "VARCHAR NOT NULL DEFAULT 'ingest'",
+}
+
+
+def add_job_columns(conn):
+    """
+
+    Add the ingestionjob columns introduced since the table was created (reused chunk counts,
+    job claim owner and lease, job action) to existing databases. Safe to run more than once.
+
+    """
+
+    job_columns = {column["name"] for column in inspect(conn).get_columns("ingestionjob")}
+    for name, definition in JOB_COLUMNS.items():
+        if name not in job_columns:
+            conn.execute(text(f"ALTER TABLE ingestionjob ADD COLUMN {name} {definition}"))
+            print(f"✅ Added ingestionjob.{name}")
+
+
+def library_migration_pending(conn) -> bool:
+    job_columns = {column["name"] for column in inspect(conn).get_columns("ingestionjob")}
+    return "namespace" not in job_columns
+
+
+def migrate_library_ids(conn, stored_namespaces=()):
+    """
+
+    Move document storage from per-login session IDs to per-user library IDs. Each existing user
+    gets the namespace of their current session as library ID, so the documents uploaded in
+    that session stay reachable; users without a session get a new, empty library. Ingestion
+    jobs have their session_id column renamed to namespace, and the namespaces of earlier
+    sessions, from the job table and from `stored_namespaces` (those listed by the vector index
+    and the local stores), are recorded as legacy namespaces. Safe to run more than once.
+
+    """
+
+    inspector = inspect(conn)
+
+    user_columns = {column["name"] for column in inspector.get_columns("user")}
+    if "library_id" not in user_columns:
+        conn.execute(text('ALTER TABLE "user" ADD COLUMN library_id VARCHAR'))
+    users = conn.execute(
+        text('SELECT id, session_id FROM "user" WHERE library_id IS NULL')
+    ).fetchall()
+    for user_id, session_id in users:
+        conn.execute(
+            text('UPDATE "user" SET library_id = :library_id WHERE id = :id'),
+            {"library_id": session_id or str(uuid.uuid4()), "id": user_id},
+        )
+    conn.execute(
+        text('CREATE UNIQUE INDEX IF NOT EXISTS ix_user_library_id ON "user" (library_id)')
+    )
+
+    job_columns = {column["name"] for column in inspector.get_columns("ingestionjob")}
+    if "namespace" not in job_columns:
+        conn.execute(text("ALTER TABLE ingestionjob RENAME COLUMN session_id TO namespace"))
+        conn.execute(text("DROP INDEX IF EXISTS ix_ingestionjob_session_id"))
+        record_legacy_namespaces(conn, stored_namespaces)
+    conn.execute(
+        text("CREATE INDEX IF NOT EXISTS ix_ingestionjob_namespace ON ingestionjob (namespace)")
+    )
+
+    if users:
+        print(f"✅ Assigned library IDs to {len(users)} users")
+
+
+def record_legacy_namespaces(conn, stored_namespaces=()):
+    """
+
+    Record the namespaces of earlier login sessions, taken from the ingestion jobs that uploaded
+    to them and from the namespaces found in storage, so that the namespace garbage collector
+    keeps them until they have been reviewed. Users only ever stored their latest session ID,
+    so these cannot be tied to an owner.
+
+    """
+
+    uploads = {
+        namespace: (jobs, last_upload)
+        for namespace, jobs, last_upload in conn.execute(
+            text("SELECT namespace, COUNT(*), MAX(created_at) FROM ingestionjob GROUP BY namespace")
+        ).fetchall()
+    }
+    known = {
+        namespace
+        for (namespace,) in conn.execute(
+            text(
+                'SELECT library_id FROM "user" WHERE library_id IS NOT NULL '
+                "UNION SELECT namespace FROM legacynamespace"
+            )
+        ).fetchall()
+    }
+    rows = [
+        (namespace, *uploads.get(namespace, (0, None)))
+        for namespace in sorted((set(uploads) | set(stored_namespaces)) - known - {""})
+    ]
+    for namespace, jobs, last_upload in rows:
+        conn.execute(
+            text(
+                "INSERT INTO legacynamespace (namespace, jobs, last_upload, released, recorded_at) "
+                "VALUES (:namespace, :jobs, :last_upload, :released, :recorded_at)"
+            ),
+            {
+                "namespace": namespace,
+                "jobs": jobs,
+                "last_upload": last_upload,
+                "released": False,
+                "recorded_at": datetime.utcnow(),
+            },
+        )
+    if rows:
+        print(f"✅ Recorded {len(rows)} namespaces of earlier sessions for review")
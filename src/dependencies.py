@@ -1,7 +1,24 @@
+import hmac
+
 from fastapi import Request, HTTPException
 
+from src.config.metrics import METRICS_TOKEN
+
 
 def get_current_user(request: Request):
     if not request.state.user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     return request.state.user
+
+
+def require_metrics_access(request: Request):
+    """
+
+    Allow a request that carries the metrics bearer token, or else one from a logged-in user.
+
+    """
+
+    authorization = request.headers.get("authorization", "")
+    if METRICS_TOKEN and hmac.compare_digest(authorization, f"Bearer {METRICS_TOKEN}"):
+        return
+    get_current_user(request)
@@ -0,0 +1,278 @@
+import os
+import uuid
+import socket
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+
+from sqlalchemy import and_, exists, or_, update
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+
+from src.models.job import IngestionJob
+from src.vectorstore.ingestion_pipeline import process_and_store, delete_document
+from src.config.document_manifest import document_manifest
+from src.config.answer_cache import invalidate_answers
+
+
+class IngestionJobQueue:
+    """
+
+    Background queue for document ingestion, shared by every backend process through the job
+    table. Worker tasks claim a job with a single conditional UPDATE, so a job runs in exactly
+    one process, and hold it under a lease that is renewed while it runs. Progress is written
+    back to the table as batches are embedded and upserted. A job whose lease expired, because
+    its process died, is claimed again; on shutdown, running jobs are released at once.
+    Jobs for the same document (namespace and filename) run one after another, in queue order,
+    since two versions ingested at once would each delete the other's new chunks as stale.
+    Deleting a document is a job as well, so it cannot overlap an ingestion of that document.
+
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        workers: int = 2,
+        lease_seconds: float = 60.0,
+        poll_seconds: float = 2.0,
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._signals: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._lost: Set[str] = set()
+
+    # --- Job table helpers ---
+
+    async def _create_job(
+        self, namespace: str, filename: str, file_path: str, action: str
+    ) -> IngestionJob:
+        async with self.session_factory() as db:
+            job = IngestionJob(
+                namespace=namespace, filename=filename, file_path=file_path, action=action
+            )
+            db.add(job)
+            await db.commit()
+            await db.refresh(job)
+            return job
+
+    async def _update_job(self, job_id: str, **fields) -> Optional[IngestionJob]:
+        async with self.session_factory() as db:
+            job = await db.get(IngestionJob, job_id)
+            if not job:
+                return None
+            for key, value in fields.items():
+                setattr(job, key, value)
+            job.updated_at = datetime.utcnow()
+            db.add(job)
+            await db.commit()
+            await db.refresh(job)
+            return job
+
+    def _claimable(self, now: datetime):
+        """
+
+        Condition for jobs that may be claimed: queued, or running under an expired lease, and
+        not behind an earlier pending job or a running one for the same document.
+
+        """
+
+        other = aliased(IngestionJob)
+        blocked = exists().where(
+            other.namespace == IngestionJob.namespace,
+            other.filename == IngestionJob.filename,
+            other.id != IngestionJob.id,
+            other.status.in_(["queued", "running"]),
+            or_(
+                other.created_at < IngestionJob.created_at,
+                and_(other.created_at == IngestionJob.created_at, other.id < IngestionJob.id),
+                and_(other.status == "running", other.lease_expires_at >= now),
+            ),
+        )
+        return and_(
+            or_(
+                IngestionJob.status == "queued",
+                and_(
+                    IngestionJob.status == "running",
+                    or_(IngestionJob.lease_expires_at.is_(None), IngestionJob.lease_expires_at < now),
+                ),
+            ),
+            ~blocked,
+        )
+
+    async def _claim(self) -> Optional[IngestionJob]:
+        now = datetime.utcnow()
+        async with self.session_factory() as db:
+            candidates = (
+                await db.exec(
+                    select(IngestionJob.id)
+                    .where(self._claimable(now))
+                    .order_by(IngestionJob.created_at)
+                    .limit(self.workers)
+                )
+            ).all()
+            for job_id in candidates:
+                # The condition is checked again by the UPDATE itself, so of several processes
+                # racing for the same job only one gets it. A resumed job restarts from the
+                # beginning of its file; chunks that were already upserted are recognised by
+                # their content IDs and not embedded again.
+                result = await db.exec(
+                    update(IngestionJob)
+                    .where(IngestionJob.id == job_id, self._claimable(now))
+                    .values(
+                        status="running",
+                        owner=self.owner,
+                        lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                        chunks_embedded=0,
+                        chunks_reused=0,
+                        batches_upserted=0,
+                        updated_at=now,
+                    )
+                )
+                await db.commit()
+                if result.rowcount:
+                    return await db.get(IngestionJob, job_id)
+        return None
+
+    async def _renew(self, job_id: str) -> bool:
+        async with self.session_factory() as db:
+            result = await db.exec(
+                update(IngestionJob)
+                .where(
+                    IngestionJob.id == job_id,
+                    IngestionJob.owner == self.owner,
+                    IngestionJob.status == "running",
+                )
+                .values(
+                    lease_expires_at=datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+                )
+            )
+            await db.commit()
+            return bool(result.rowcount)
+
+    async def _release(self):
+        # Jobs interrupted by shutdown are handed back at once instead of waiting for their lease.
+        async with self.session_factory() as db:
+            await db.exec(
+                update(IngestionJob)
+                .where(IngestionJob.owner == self.owner, IngestionJob.status == "running")
+                .values(status="queued", owner=None, lease_expires_at=None)
+            )
+            await db.commit()
+
+    async def get(self, job_id: str) -> Optional[IngestionJob]:
+        async with self.session_factory() as db:
+            return await db.get(IngestionJob, job_id)
+
+    # --- Queue lifecycle ---
+
+    async def start(self):
+        self._signals = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self._release()
+
+    async def submit(self, namespace: str, filename: str, file_path: str) -> IngestionJob:
+        job = await self._create_job(namespace, filename, file_path, "ingest")
+        # Wakes a local worker right away; other processes find the job when they next poll.
+        self._signals.put_nowait(job.id)
+        return job
+
+    async def submit_delete(self, namespace: str, filename: str) -> IngestionJob:
+        """
+
+        Queue the deletion of a document. It runs after the jobs already queued for the
+        document, and deletes whichever version of it is stored by then.
+
+        """
+
+        job = await self._create_job(namespace, filename, "", "delete")
+        # Wakes a local worker right away; other processes find the job when they next poll.
+        self._signals.put_nowait(job.id)
+        return job
+
+    # --- Workers ---
+
+    async def _worker(self):
+        while True:
+            try:
+                job = await self._claim()
+            except Exception as e:
+                print(f"[Ingestion queue error] {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._signals.get(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._run(job)
+            except Exception as e:
+                print(f"[Ingestion job error] {job.id}: {e}")
+
+    async def _heartbeat(self, job_id: str, task: asyncio.Task):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await self._renew(job_id):
+                # Another process has taken the job over; stop working on it.
+                print(f"[Ingestion job] Lost the lease on {job_id}; abandoning it.")
+                self._lost.add(job_id)
+                task.cancel()
+                return
+
+    async def _run(self, job: IngestionJob):
+        job_id = job.id
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, asyncio.current_task()))
+
+        async def on_progress(**progress):
+            await self._update_job(job_id, **progress)
+
+        try:
+            if job.action == "delete":
+                await self._delete(job)
+            else:
+                if not os.path.exists(job.file_path):
+                    raise FileNotFoundError(f"Uploaded file is missing: {job.filename}")
+                await process_and_store(
+                    file_path=job.file_path,
+                    filename=job.filename,
+                    namespace=job.namespace,
+                    on_progress=on_progress,
+                )
+        except asyncio.CancelledError:
+            if job_id not in self._lost:
+                # Shutdown: the job keeps its file and is released by stop().
+                raise
+            # The new owner continues with the file in place.
+            self._lost.discard(job_id)
+            asyncio.current_task().uncancel()
+            return
+        except Exception as e:
+            await self._update_job(
+                job_id, status="failed", error=str(e), owner=None, lease_expires_at=None
+            )
+        else:
+            await self._update_job(
+                job_id, status="completed", owner=None, lease_expires_at=None
+            )
+        finally:
+            heartbeat.cancel()
+
+        # Cached answers for this namespace may no longer reflect its documents.
+        await invalidate_answers(job.namespace)
+        if job.file_path and os.path.exists(job.file_path):
+            os.remove(job.file_path)
+
+    async def _delete(self, job: IngestionJob):
+        document = await asyncio.to_thread(document_manifest.find, job.namespace, job.filename)
+        if document:
+            await delete_document(document["id"])
@@ -0,0 +1,156 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Set, Tuple
+
+from sqlmodel import select
+
+from src.models.user import User
+from src.models.job import IngestionJob
+from src.models.legacy_namespace import LegacyNamespace
+
+
+class NamespaceCollector:
+    """
+
+    Background garbage collector for document namespaces that no longer belong to anyone.
+    Only namespaces this app created are considered: those of the chunk store, the document
+    manifest, the ingestion job table and the legacy namespaces recorded by the library ID
+    migration. Other namespaces found only in the vector index, which may be shared, and the
+    default "" namespace are never touched. Every `interval_seconds`, those that are neither a
+    user's library ID, the target of a queued or running job, nor a legacy namespace still
+    under review are purged from each store that holds them, with one bulk delete per store,
+    `concurrency` namespaces at a time. A legacy namespace is under review until it is released
+    or, with `legacy_retention_days`, until that many days after it was recorded. With
+    `dry_run`, orphans are only reported.
+
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        index_factory: Callable,
+        chunk_store,
+        document_manifest,
+        interval_seconds: float = 3600.0,
+        concurrency: int = 4,
+        dry_run: bool = False,
+        legacy_retention_days: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.index_factory = index_factory
+        self.chunk_store = chunk_store
+        self.document_manifest = document_manifest
+        self.interval_seconds = interval_seconds
+        self.concurrency = concurrency
+        self.dry_run = dry_run
+        self.legacy_retention_days = legacy_retention_days
+        self._task: Optional[asyncio.Task] = None
+        self._runs = 0
+        self._purged = 0
+        self._last_orphaned: List[str] = []
+        self._last_error: Optional[str] = None
+
+    async def _namespaces(self) -> Tuple[Set[str], Set[str]]:
+        """
+
+        Return the live namespaces and the namespaces this app created according to its database:
+        those of all ingestion jobs and all legacy namespaces.
+
+        """
+
+        under_review = LegacyNamespace.released.is_(False)
+        if self.legacy_retention_days is not None:
+            expiry = datetime.utcnow() - timedelta(days=self.legacy_retention_days)
+            under_review = under_review & (LegacyNamespace.recorded_at > expiry)
+        async with self.session_factory() as db:
+            libraries = (await db.exec(select(User.library_id))).all()
+            active_jobs = (
+                await db.exec(
+                    select(IngestionJob.namespace).where(
+                        IngestionJob.status.in_(["queued", "running"])
+                    )
+                )
+            ).all()
+            legacy = (
+                await db.exec(select(LegacyNamespace.namespace).where(under_review))
+            ).all()
+            jobs = (await db.exec(select(IngestionJob.namespace).distinct())).all()
+            recorded = (await db.exec(select(LegacyNamespace.namespace))).all()
+        return set(libraries) | set(active_jobs) | set(legacy), set(jobs) | set(recorded)
+
+    async def collect(self) -> List[str]:
+        """
+
+        Run one collection and return the orphaned namespaces found.
+
+        """
+
+        index = await self.index_factory()
+        # Listed before the live namespaces are read, so that a namespace created in between
+        # cannot be mistaken for an orphan.
+        index_namespaces = set(await index.list_namespaces())
+        store_namespaces = set(await asyncio.to_thread(self.chunk_store.namespaces))
+        manifest_namespaces = set(await asyncio.to_thread(self.document_manifest.namespaces))
+        live, recorded_namespaces = await self._namespaces()
+        if not live:
+            # No users at all more likely means a wrong database than an empty service.
+            print("[Namespace GC] No live namespaces found; skipping collection.")
+            return []
+
+        owned = store_namespaces | manifest_namespaces | recorded_namespaces
+        stored = index_namespaces | store_namespaces | manifest_namespaces
+        orphaned = sorted((owned & stored) - live - {""})
+        self._runs += 1
+        self._last_orphaned = orphaned
+        if self.dry_run or not orphaned:
+            if orphaned:
+                print(
+                    f"[Namespace GC] {len(orphaned)} orphaned namespaces (dry run): "
+                    + ", ".join(orphaned[:20])
+                    + (", ..." if len(orphaned) > 20 else "")
+                )
+            return orphaned
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def purge(namespace: str):
+            async with semaphore:
+                if namespace in index_namespaces:
+                    await index.delete_namespace(namespace)
+                if namespace in store_namespaces:
+                    await asyncio.to_thread(self.chunk_store.delete_namespace, namespace)
+                if namespace in manifest_namespaces:
+                    await asyncio.to_thread(self.document_manifest.delete_namespace, namespace)
+                self._purged += 1
+
+        await asyncio.gather(*(purge(namespace) for namespace in orphaned))
+        print(f"🗑️ Purged {len(orphaned)} orphaned namespaces.")
+        return orphaned
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.collect()
+                self._last_error = None
+            except Exception as e:
+                self._last_error = str(e)
+                print(f"[Namespace GC error] {e}")
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "runs": self._runs,
+            "purged": self._purged,
+            "last_orphaned": len(self._last_orphaned),
+            "dry_run": self.dry_run,
+            "last_error": self._last_error,
+        }
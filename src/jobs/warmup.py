@@ -0,0 +1,66 @@
+import time
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+class Warmup:
+    """
+
+    Background warmup of the clients that are created lazily, so that neither importing the app
+    nor starting it waits on the network. Each component runs concurrently and is retried every
+    `retry_seconds` until it succeeds; the app is ready once all components have warmed up.
+
+    """
+
+    def __init__(
+        self,
+        components: Dict[str, Callable[[], Awaitable]],
+        retry_seconds: float = 5.0,
+    ):
+        self.components = components
+        self.retry_seconds = retry_seconds
+        self._status = {
+            name: {"ready": False, "attempts": 0, "error": None, "seconds": None}
+            for name in components
+        }
+        self._tasks: List[asyncio.Task] = []
+        self._started: Optional[float] = None
+
+    async def _warm(self, name: str, warm: Callable[[], Awaitable]):
+        status = self._status[name]
+        while True:
+            status["attempts"] += 1
+            try:
+                await warm()
+            except Exception as e:
+                status["error"] = str(e)
+                print(f"[Warmup] {name} failed: {e}. Retrying in {self.retry_seconds}s.")
+                await asyncio.sleep(self.retry_seconds)
+                continue
+            status.update(
+                ready=True, error=None, seconds=time.perf_counter() - self._started
+            )
+            return
+
+    async def start(self):
+        self._started = time.perf_counter()
+        self._tasks = [
+            asyncio.create_task(self._warm(name, warm))
+            for name, warm in self.components.items()
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def ready(self) -> bool:
+        return all(status["ready"] for status in self._status.values())
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "components": {name: dict(status) for name, status in self._status.items()},
+        }
@@ -0,0 +1,55 @@
+import threading
+from typing import Optional
+
+from cachetools import TTLCache
+
+from src.models.user import User
+
+
+_MISSING = object()
+
+
+class SessionCache:
+    """
+
+    TTL/LRU cache of session_id -> resolved User (or None for unknown sessions), so that the
+    session middleware does not hit the database on every request. Entries are dropped on login
+    and logout; the TTL bounds how long other worker processes may serve a stale session.
+
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 10000):
+        self._cache = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_id: str):
+        """
+
+        Return the cached User (or None for a known-invalid session), or the _MISSING sentinel.
+
+        """
+
+        with self._lock:
+            user = self._cache.get(session_id, _MISSING)
+            if user is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return user
+
+    def put(self, session_id: str, user: Optional[User]):
+        with self._lock:
+            self._cache[session_id] = user
+
+    def invalidate(self, session_id: Optional[str]):
+        if not session_id:
+            return
+        with self._lock:
+            self._cache.pop(session_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
@@ -1,21 +1,56 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from sqlmodel import Session as DBSession, select
-from src.db.session import engine
+from typing import Iterable, Optional
+
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Receive, Scope, Send
+from sqlmodel import select
+from src.db.session import async_session
 from src.models.user import User
+from src.middleware.session_cache import SessionCache, _MISSING
+from src.config.session import session_cache as default_session_cache, SESSION_PUBLIC_PATHS
 
 
-class SessionMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        session_id = request.cookies.get("session_id")
-        user = None
+async def load_user(session_id: str) -> Optional[User]:
+    async with async_session() as db:
+        return (await db.exec(select(User).where(User.session_id == session_id))).first()
+
+
+class SessionMiddleware:
+    """
+
+    Pure ASGI middleware that resolves the session_id cookie to a User and stores it on
+    request.state.user. Lookups go through a SessionCache and hit the database (through the
+    indexed session_id column) only on a cache miss. Requests under one of
+    the public path prefixes are passed through without a lookup.
 
-        if session_id:
-            with DBSession(engine) as db:
-                user = db.exec(
-                    select(User).where(User.session_id == session_id)
-                ).first()
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        session_cache: SessionCache = default_session_cache,
+        public_paths: Iterable[str] = SESSION_PUBLIC_PATHS,
+    ):
+        self.app = app
+        self.session_cache = session_cache
+        self.public_paths = tuple(public_paths)
+
+    async def resolve_user(self, session_id: str) -> Optional[User]:
+        user = self.session_cache.get(session_id)
+        if user is _MISSING:
+            user = await load_user(session_id)
+            self.session_cache.put(session_id, user)
+        return user
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        user = None
+        if not scope["path"].startswith(self.public_paths):
+            session_id = HTTPConnection(scope).cookies.get("session_id")
+            if session_id:
+                user = await self.resolve_user(session_id)
 
-        request.state.user = user
-        response = await call_next(request)
-        return response
+        scope.setdefault("state", {})["user"] = user
+        await self.app(scope, receive, send)
@@ -0,0 +1,24 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+import uuid
+
+
+class IngestionJob(SQLModel, table=True):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
+    namespace: str = Field(index=True)
+    filename: str
+    file_path: str
+    # "ingest" processes the uploaded file; "delete" removes the document with this filename.
+    action: str = "ingest"
+    status: str = Field(default="queued", index=True)
+    chunks_total: Optional[int] = None
+    chunks_embedded: int = 0
+    chunks_reused: int = 0
+    batches_upserted: int = 0
+    error: Optional[str] = None
+    # Process that claimed the job, and until when; an expired lease lets another process resume it.
+    owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
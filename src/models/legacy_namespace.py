@@ -0,0 +1,14 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class LegacyNamespace(SQLModel, table=True):
+    # A namespace of an earlier login session, found by the library ID migration. Sessions were
+    # never recorded per user, so its owner is unknown; the namespace garbage collector keeps it
+    # until it is released after review (python legacy_namespaces.py release <namespace>).
+    namespace: str = Field(primary_key=True)
+    jobs: int = 0
+    last_upload: Optional[datetime] = None
+    released: bool = False
+    recorded_at: datetime = Field(default_factory=datetime.utcnow)
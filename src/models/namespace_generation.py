@@ -0,0 +1,8 @@
+from sqlmodel import SQLModel, Field
+
+
+class NamespaceGeneration(SQLModel, table=True):
+    # Bumped whenever the documents of a namespace change, so that every backend worker drops
+    # the answers it cached for the namespace before the change.
+    namespace: str = Field(primary_key=True)
+    generation: int = 0
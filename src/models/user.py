@@ -7,4 +7,10 @@ class User(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     email: str = Field(index=True, unique=True)
     hashed_password: str
-    session_id: Optional[str] = Field(default_factory=lambda: str(uuid.uuid4()))
+    session_id: Optional[str] = Field(
+        default_factory=lambda: str(uuid.uuid4()), index=True
+    )
+    # Stable namespace of the user's documents; unlike session_id it survives logins.
+    library_id: str = Field(
+        default_factory=lambda: str(uuid.uuid4()), index=True, unique=True
+    )
@@ -0,0 +1,113 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+
+class PasswordHasherBusy(Exception):
+    """
+
+    Raised when too many hashing requests are already waiting for the executor.
+
+    """
+
+
+class PasswordHasher:
+    """
+
+    Runs bcrypt hashing and verification in a dedicated, size-limited thread pool, so that a
+    burst of logins cannot exhaust the shared threadpool used by the rest of the application.
+    At most `max_pending` requests wait in the queue; beyond that, PasswordHasherBusy is raised.
+    The bcrypt cost is configurable, and verify_and_update returns a new hash when the stored
+    one was made with different settings.
+
+    """
+
+    def __init__(self, rounds: int = 12, max_workers: int = 2, max_pending: int = 64):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        # Pinning min and max to the configured cost makes needs_update flag hashes of any other cost.
+        self.context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=rounds,
+            bcrypt__min_rounds=rounds,
+            bcrypt__max_rounds=rounds,
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hasher"
+        )
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.started = 0
+        self.finished = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+        self.total_wait_seconds = 0.0
+        self.total_hash_seconds = 0.0
+
+    def _timed(self, func, queued_at: float, *args):
+        started_at = time.perf_counter()
+        with self._lock:
+            self.started += 1
+            self.total_wait_seconds += started_at - queued_at
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.finished += 1
+                self.total_hash_seconds += time.perf_counter() - started_at
+
+    async def _run(self, func, *args):
+        with self._lock:
+            if self.submitted - self.started >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy("Too many password hashing requests in progress")
+            self.submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.submitted - self.started)
+        future = self._executor.submit(self._timed, func, time.perf_counter(), *args)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if future.cancelled():
+                # Never started, so it no longer counts towards the queue depth.
+                with self._lock:
+                    self.submitted -= 1
+            raise
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+
+        Verify the password and return (valid, new_hash). new_hash is set when the stored hash
+        needs an upgrade (e.g. a different cost factor) and should replace it.
+
+        """
+
+        return await self._run(self.context.verify_and_update, password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "rounds": self.rounds,
+                "queue_depth": self.submitted - self.started,
+                "active": self.started - self.finished,
+                "max_queue_depth": self.max_queue_depth,
+                "completed": self.finished,
+                "rejected": self.rejected,
+                "avg_wait_ms": 1000 * self.total_wait_seconds / self.started if self.started else 0.0,
+                "avg_hash_ms": 1000 * self.total_hash_seconds / self.finished if self.finished else 0.0,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
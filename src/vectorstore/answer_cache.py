@@ -0,0 +1,138 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """
+
+    Per-namespace cache of generated answers. A new query is served from the cache when its
+    embedding is close enough (cosine similarity) to a previously answered query in the same
+    namespace. Entries expire after a TTL, each namespace keeps at most a fixed number of
+    entries (LRU), and invalidating a namespace bumps its generation so that answers computed
+    before the invalidation are never stored afterwards. Callers that pass the generation read
+    from a shared store keep several processes consistent: a newer generation seen by lookup or
+    store drops the entries cached under an older one.
+
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        ttl_seconds: float = 3600,
+        max_entries_per_namespace: int = 100,
+        max_namespaces: int = 10000,
+        enabled: bool = True,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_namespace = max_entries_per_namespace
+        self.max_namespaces = max_namespaces
+        self.enabled = enabled
+
+        self._namespaces: "OrderedDict[str, OrderedDict]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def generation(self, namespace: str) -> int:
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def _advance(self, namespace: str, generation: Optional[int]):
+        if generation is not None and generation > self._generations.get(namespace, 0):
+            self._namespaces.pop(namespace, None)
+            self._generations[namespace] = generation
+
+    def lookup(
+        self, namespace: str, query_vector: List[float], generation: Optional[int] = None
+    ) -> Optional[str]:
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            self._advance(namespace, generation)
+            entries = self._namespaces.get(namespace)
+            if not entries:
+                self.misses += 1
+                return None
+
+            now = time.time()
+            for key in [k for k, e in entries.items() if now - e["created_at"] > self.ttl_seconds]:
+                del entries[key]
+            if not entries:
+                del self._namespaces[namespace]
+                self.misses += 1
+                return None
+
+            keys = list(entries.keys())
+            matrix = np.stack([entries[k]["vector"] for k in keys])
+            scores = matrix @ self._normalize(query_vector)
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            entries.move_to_end(keys[best])
+            self._namespaces.move_to_end(namespace)
+            self.hits += 1
+            return entries[keys[best]]["answer"]
+
+    def store(
+        self,
+        namespace: str,
+        query: str,
+        query_vector: List[float],
+        answer: str,
+        generation: Optional[int] = None,
+    ):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._advance(namespace, generation)
+            if generation is not None and generation != self._generations.get(namespace, 0):
+                # The namespace was invalidated while this answer was being generated.
+                return
+
+            entries = self._namespaces.setdefault(namespace, OrderedDict())
+            key = query.strip().lower()
+            entries[key] = {
+                "vector": self._normalize(query_vector),
+                "answer": answer,
+                "created_at": time.time(),
+            }
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries_per_namespace:
+                entries.popitem(last=False)
+
+            self._namespaces.move_to_end(namespace)
+            while len(self._namespaces) > self.max_namespaces:
+                self._namespaces.popitem(last=False)
+
+    def invalidate(self, namespace: str, generation: Optional[int] = None):
+        with self._lock:
+            self._namespaces.pop(namespace, None)
+            if generation is None:
+                generation = self._generations.get(namespace, 0) + 1
+            self._generations[namespace] = max(generation, self._generations.get(namespace, 0))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "namespaces": len(self._namespaces),
+                "entries": sum(len(entries) for entries in self._namespaces.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,162 @@
+import json
+import random
+import asyncio
+import threading
+from typing import List, Optional, Tuple
+
+
+class BulkUpserter:
+    """
+
+    Upserts vectors in requests packed by serialized size instead of by count: each request
+    holds as many vectors as fit in `max_request_bytes` (and at most `max_vectors_per_request`).
+    The requests of one call are sent concurrently, with at most `concurrency` requests in
+    flight across the process. Each request is retried on its own with jittered exponential
+    backoff, so a failure resends only the vectors of that request.
+
+    """
+
+    def __init__(
+        self,
+        max_request_bytes: int = 1_800_000,
+        max_vectors_per_request: int = 1000,
+        concurrency: int = 8,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+    ):
+        self.max_request_bytes = max_request_bytes
+        self.max_vectors_per_request = max_vectors_per_request
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._vectors = 0
+        self._bytes = 0
+        self._retries = 0
+        self._failed = 0
+        self._in_flight = 0
+        self._max_in_flight = 0
+
+    @staticmethod
+    def vector_size(vector: dict) -> int:
+        return len(json.dumps(vector, separators=(",", ":")))
+
+    def request_bytes(self, vectors: List[dict]) -> int:
+        # One byte per separating comma.
+        return sum(self.vector_size(vector) + 1 for vector in vectors)
+
+    def fits(self, count: int, size: int) -> bool:
+        """
+
+        Whether `count` vectors of `size` bytes in total fit in a single request.
+
+        """
+
+        return count <= self.max_vectors_per_request and size <= self.max_request_bytes
+
+    def pack(self, vectors: List[dict]) -> List[Tuple[List[dict], int]]:
+        """
+
+        Split vectors into request-sized groups, keeping their order, and return each group with
+        its estimated size in bytes. A vector larger than the byte limit on its own is sent alone.
+
+        """
+
+        requests, current, current_bytes = [], [], 0
+        for vector in vectors:
+            # One byte per separating comma.
+            size = self.vector_size(vector) + 1
+            if current and (
+                current_bytes + size > self.max_request_bytes
+                or len(current) >= self.max_vectors_per_request
+            ):
+                requests.append((current, current_bytes))
+                current, current_bytes = [], 0
+            current.append(vector)
+            current_bytes += size
+        if current:
+            requests.append((current, current_bytes))
+        return requests
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, self.backoff_base * 2**attempt)
+
+    async def _send(self, index, vectors: List[dict], size: int, namespace: str):
+        attempt = 0
+        while True:
+            async with self._get_semaphore():
+                with self._lock:
+                    self._in_flight += 1
+                    self._max_in_flight = max(self._max_in_flight, self._in_flight)
+                try:
+                    await index.upsert(vectors=vectors, namespace=namespace)
+                    break
+                except ValueError:
+                    # Invalid vectors (e.g. a dimension mismatch) fail the same way every time.
+                    with self._lock:
+                        self._failed += 1
+                    raise
+                except Exception as e:
+                    if attempt >= self.max_retries:
+                        with self._lock:
+                            self._failed += 1
+                        raise
+                    print(f"[Upsert retry] {len(vectors)} vectors, attempt {attempt + 1}: {e}")
+                finally:
+                    with self._lock:
+                        self._in_flight -= 1
+            with self._lock:
+                self._retries += 1
+            await asyncio.sleep(self._backoff(attempt))
+            attempt += 1
+
+        with self._lock:
+            self._requests += 1
+            self._vectors += len(vectors)
+            self._bytes += size
+
+    async def upsert(self, index, vectors: List[dict], namespace: str) -> int:
+        """
+
+        Upsert vectors into the namespace of the index and return the number of requests sent.
+        The first request that still fails after its retries cancels the others and is raised.
+
+        """
+
+        requests = self.pack(vectors)
+        tasks = [
+            asyncio.create_task(self._send(index, group, size, namespace))
+            for group, size in requests
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return len(requests)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "vectors": self._vectors,
+                "avg_vectors_per_request": self._vectors / self._requests if self._requests else 0.0,
+                "avg_request_bytes": self._bytes / self._requests if self._requests else 0.0,
+                "retries": self._retries,
+                "failed": self._failed,
+                "in_flight": self._in_flight,
+                "max_in_flight": self._max_in_flight,
+            }
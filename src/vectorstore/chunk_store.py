@@ -0,0 +1,163 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+from typing import Dict, List, Set
+
+from langchain_core.documents import Document
+
+
+class ChunkStore:
+    """
+
+    SQLite store of chunk text and metadata per namespace, with an FTS5 full-text index over it
+    for BM25 keyword search. The FTS table is an external-content index kept in sync by triggers,
+    so each chunk's text is stored once.
+
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS chunks (
+                rowid INTEGER PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                chunk_id TEXT NOT NULL,
+                text TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                UNIQUE (namespace, chunk_id)
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+                namespace, text, content='chunks', content_rowid='rowid'
+            );
+            CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
+                INSERT INTO chunks_fts (rowid, namespace, text)
+                VALUES (new.rowid, new.namespace, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
+                INSERT INTO chunks_fts (chunks_fts, rowid, namespace, text)
+                VALUES ('delete', old.rowid, old.namespace, old.text);
+            END;
+            """
+        )
+        self._conn.commit()
+
+    def add_chunks(self, namespace: str, chunks: List[Document]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO chunks (namespace, chunk_id, text, metadata) VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        namespace,
+                        chunk.metadata["chunk_id"],
+                        chunk.page_content,
+                        json.dumps(chunk.metadata),
+                    )
+                    for chunk in chunks
+                ],
+            )
+            self._conn.commit()
+
+    def delete_chunks(self, namespace: str, chunk_ids: List[str]):
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM chunks WHERE namespace = ? AND chunk_id = ?",
+                [(namespace, chunk_id) for chunk_id in chunk_ids],
+            )
+            self._conn.commit()
+
+    def stored_ids(self, namespace: str, chunk_ids: List[str]) -> Set[str]:
+        found = set()
+        with self._lock:
+            for i in range(0, len(chunk_ids), 500):
+                part = chunk_ids[i : i + 500]
+                placeholders = ",".join("?" * len(part))
+                found.update(
+                    row[0]
+                    for row in self._conn.execute(
+                        f"SELECT chunk_id FROM chunks WHERE namespace = ? AND chunk_id IN ({placeholders})",
+                        [namespace, *part],
+                    )
+                )
+        return found
+
+    def namespaces(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT namespace FROM chunks")]
+
+    def delete_namespace(self, namespace: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks WHERE namespace = ?", (namespace,))
+            self._conn.commit()
+
+    def get_many(self, namespace: str, chunk_ids: List[str]) -> Dict[str, Document]:
+        """
+
+        Return the stored chunks of the namespace by chunk ID; unknown IDs are left out.
+
+        """
+
+        found = {}
+        with self._lock:
+            for i in range(0, len(chunk_ids), 500):
+                part = chunk_ids[i : i + 500]
+                placeholders = ",".join("?" * len(part))
+                for chunk_id, text, metadata in self._conn.execute(
+                    f"SELECT chunk_id, text, metadata FROM chunks WHERE namespace = ? AND chunk_id IN ({placeholders})",
+                    [namespace, *part],
+                ).fetchall():
+                    found[chunk_id] = Document(
+                        id=chunk_id, page_content=text, metadata=json.loads(metadata)
+                    )
+        return found
+
+    @staticmethod
+    def _phrase(value: str) -> str:
+        return '"' + value.replace('"', '""') + '"'
+
+    def _match_expression(self, namespace: str, query: str) -> str:
+        terms = list(dict.fromkeys(re.findall(r"\w+", query.lower())))[:32]
+        if not terms:
+            return ""
+        return (
+            f"namespace : {self._phrase(namespace)} AND text : ("
+            + " OR ".join(self._phrase(term) for term in terms)
+            + ")"
+        )
+
+    def search(self, namespace: str, query: str, top_k: int = 5) -> List[Document]:
+        """
+
+        Return the top_k chunks of the namespace ranked by BM25 against the query terms.
+
+        """
+
+        expression = self._match_expression(namespace, query)
+        if not expression:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT c.chunk_id, c.text, c.metadata
+                FROM chunks_fts
+                JOIN chunks c ON c.rowid = chunks_fts.rowid
+                WHERE chunks_fts MATCH ? AND c.namespace = ?
+                ORDER BY bm25(chunks_fts, 0.0, 1.0)
+                LIMIT ?
+                """,
+                (expression, namespace, top_k),
+            ).fetchall()
+        return [
+            Document(id=chunk_id, page_content=text, metadata=json.loads(metadata))
+            for chunk_id, text, metadata in rows
+        ]
@@ -0,0 +1,171 @@
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import tiktoken
+from langchain_core.documents import Document
+
+
+class TokenCounter:
+    """
+
+    Counts tokens with a tiktoken encoding. When the encoding cannot be loaded (its BPE file
+    is downloaded on first use), counts fall back to an estimate of four characters per token.
+    Loading and counting block, so async code should call them from a worker thread.
+
+    """
+
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        self.encoding_name = encoding_name
+        self._encoding = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def encoding(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        self._encoding = tiktoken.get_encoding(self.encoding_name)
+                    except Exception as e:
+                        print(
+                            f"[Token counter] Could not load {self.encoding_name}: {e}. "
+                            "Estimating tokens."
+                        )
+                    self._loaded = True
+        return self._encoding
+
+    def count(self, text: str) -> int:
+        if self.encoding is None:
+            return len(text) // 4 + 1
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def count_all(self, texts: Iterable[str]) -> int:
+        return sum(self.count(text) for text in texts)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if self.encoding is None:
+            return text[: max(0, max_tokens - 1) * 4]
+        tokens = self.encoding.encode(text, disallowed_special=())
+        return self.encoding.decode(tokens[:max_tokens])
+
+
+class ContextPacker:
+    """
+
+    Packs reranked chunks into a prompt context within a token budget:
+
+    - chunks of the same file and page whose ranges overlap or touch (by `start_index`) are
+      merged into one passage, so the splitter's chunk overlap is not repeated;
+    - passages that are near-duplicates of a better-ranked passage (Jaccard similarity of
+      word shingles above `duplicate_threshold`) are dropped;
+    - passages are added in rerank order while they fit in `token_budget`; the best passage
+      is truncated if it alone exceeds the budget.
+
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 3000,
+        duplicate_threshold: float = 0.9,
+        counter: Optional[TokenCounter] = None,
+        separator: str = "\n\n",
+    ):
+        self.token_budget = token_budget
+        self.duplicate_threshold = duplicate_threshold
+        self.counter = counter or TokenCounter()
+        self.separator = separator
+
+    @staticmethod
+    def _source_key(doc: Document):
+        metadata = doc.metadata or {}
+        return (metadata.get("filename") or metadata.get("source"), metadata.get("page"))
+
+    def merge_neighbors(self, docs: List[Document]) -> List[Document]:
+        """
+
+        Merge overlapping or adjacent chunks of the same file and page. A merged passage takes
+        the position of its best-ranked chunk. Chunks without a start_index are kept as they are.
+
+        """
+
+        groups: Dict[tuple, List[Tuple[int, Document]]] = {}
+        passages: List[Tuple[int, Document]] = []
+        for rank, doc in enumerate(docs):
+            if isinstance((doc.metadata or {}).get("start_index"), int):
+                groups.setdefault(self._source_key(doc), []).append((rank, doc))
+            else:
+                passages.append((rank, doc))
+
+        for members in groups.values():
+            members.sort(key=lambda item: item[1].metadata["start_index"])
+            rank, current = members[0]
+            start = current.metadata["start_index"]
+            text = current.page_content
+            for next_rank, doc in members[1:]:
+                next_start = doc.metadata["start_index"]
+                end = start + len(text)
+                if next_start <= end:
+                    text += doc.page_content[end - next_start :]
+                    rank = min(rank, next_rank)
+                    continue
+                passages.append((rank, self._passage(current, start, text)))
+                rank, current, start, text = next_rank, doc, next_start, doc.page_content
+            passages.append((rank, self._passage(current, start, text)))
+
+        passages.sort(key=lambda item: item[0])
+        return [doc for _, doc in passages]
+
+    @staticmethod
+    def _passage(doc: Document, start: int, text: str) -> Document:
+        if text is doc.page_content:
+            return doc
+        return Document(
+            id=doc.id, page_content=text, metadata={**doc.metadata, "start_index": start}
+        )
+
+    @staticmethod
+    def _shingles(text: str, size: int = 3) -> set:
+        words = re.findall(r"\w+", text.lower())
+        if len(words) < size:
+            return {tuple(words)}
+        return {tuple(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+    def remove_near_duplicates(self, docs: List[Document]) -> List[Document]:
+        kept, kept_shingles = [], []
+        for doc in docs:
+            shingles = self._shingles(doc.page_content)
+            if any(
+                len(shingles & other) / (len(shingles | other) or 1) >= self.duplicate_threshold
+                for other in kept_shingles
+            ):
+                continue
+            kept.append(doc)
+            kept_shingles.append(shingles)
+        return kept
+
+    def pack(self, docs: List[Document]) -> Tuple[List[Document], int]:
+        """
+
+        Return the passages to put in the prompt, in rerank order, and their token count.
+
+        """
+
+        passages = self.remove_near_duplicates(self.merge_neighbors(docs))
+        separator_tokens = self.counter.count(self.separator)
+
+        packed, used = [], 0
+        for doc in passages:
+            tokens = self.counter.count(doc.page_content) + (separator_tokens if packed else 0)
+            if used + tokens <= self.token_budget:
+                packed.append(doc)
+                used += tokens
+            elif not packed:
+                text = self.counter.truncate(doc.page_content, self.token_budget)
+                packed.append(Document(id=doc.id, page_content=text, metadata=doc.metadata))
+                used = self.counter.count(text)
+        return packed, used
+
+    def context_text(self, docs: List[Document]) -> str:
+        return self.separator.join(doc.page_content for doc in docs)
@@ -0,0 +1,191 @@
+import os
+import json
+import uuid
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class DocumentManifest:
+    """
+
+    SQLite manifest of the documents in each namespace and the chunk IDs each one stored, so that
+    a document can be listed, deleted or replaced by its own ID list instead of scanning the
+    namespace. A document is identified by (namespace, filename); uploading the same filename
+    again replaces it. Each page's content hash and chunk IDs are kept as well, so that a new
+    version only needs its changed pages parsed.
+
+    """
+
+    FIELDS = ("id", "namespace", "filename", "content_hash", "chunks", "status", "created_at", "updated_at")
+    COLUMNS = ", ".join(FIELDS)
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA foreign_keys=ON;
+            CREATE TABLE IF NOT EXISTS documents (
+                id TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                content_hash TEXT,
+                chunks INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                UNIQUE (namespace, filename)
+            );
+            CREATE TABLE IF NOT EXISTS document_chunks (
+                document_id TEXT NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+                chunk_id TEXT NOT NULL,
+                PRIMARY KEY (document_id, chunk_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS document_pages (
+                document_id TEXT NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+                page INTEGER NOT NULL,
+                page_hash TEXT NOT NULL,
+                chunk_ids TEXT NOT NULL,
+                PRIMARY KEY (document_id, page)
+            ) WITHOUT ROWID;
+            """
+        )
+        self._conn.commit()
+
+    def _row(self, row) -> dict:
+        return dict(zip(self.FIELDS, row))
+
+    def find(self, namespace: str, filename: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {self.COLUMNS} FROM documents WHERE namespace = ? AND filename = ?",
+                (namespace, filename),
+            ).fetchone()
+        return self._row(row) if row else None
+
+    def begin(self, namespace: str, filename: str) -> str:
+        """
+
+        Mark the document as being ingested and return its ID, creating the record on first upload.
+
+        """
+
+        now = datetime.utcnow().isoformat()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO documents (id, namespace, filename, status, created_at, updated_at)
+                VALUES (?, ?, ?, 'ingesting', ?, ?)
+                ON CONFLICT (namespace, filename) DO UPDATE SET status = 'ingesting', updated_at = ?
+                """,
+                (str(uuid.uuid4()), namespace, filename, now, now, now),
+            )
+            self._conn.commit()
+            return self._conn.execute(
+                "SELECT id FROM documents WHERE namespace = ? AND filename = ?",
+                (namespace, filename),
+            ).fetchone()[0]
+
+    def add_chunks(self, document_id: str, chunk_ids: Iterable[str]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO document_chunks (document_id, chunk_id) VALUES (?, ?)",
+                [(document_id, chunk_id) for chunk_id in chunk_ids],
+            )
+            self._conn.commit()
+
+    def remove_chunks(self, document_id: str, chunk_ids: Iterable[str]):
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM document_chunks WHERE document_id = ? AND chunk_id = ?",
+                [(document_id, chunk_id) for chunk_id in chunk_ids],
+            )
+            self._conn.commit()
+
+    def chunk_ids(self, document_id: str) -> List[str]:
+        with self._lock:
+            return [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT chunk_id FROM document_chunks WHERE document_id = ?", (document_id,)
+                ).fetchall()
+            ]
+
+    def pages(self, document_id: str) -> Dict[int, Tuple[str, List[str]]]:
+        """
+
+        Return the page hash and chunk IDs of every page recorded for the document.
+
+        """
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page, page_hash, chunk_ids FROM document_pages WHERE document_id = ?",
+                (document_id,),
+            ).fetchall()
+        return {page: (page_hash, json.loads(chunk_ids)) for page, page_hash, chunk_ids in rows}
+
+    def set_pages(self, document_id: str, pages: Dict[int, Tuple[str, List[str]]]):
+        with self._lock:
+            self._conn.execute("DELETE FROM document_pages WHERE document_id = ?", (document_id,))
+            self._conn.executemany(
+                "INSERT INTO document_pages (document_id, page, page_hash, chunk_ids) VALUES (?, ?, ?, ?)",
+                [
+                    (document_id, page, page_hash, json.dumps(chunk_ids))
+                    for page, (page_hash, chunk_ids) in pages.items()
+                ],
+            )
+            self._conn.commit()
+
+    def finish(self, document_id: str, status: str, content_hash: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE documents
+                SET status = ?,
+                    content_hash = COALESCE(?, content_hash),
+                    chunks = (SELECT COUNT(*) FROM document_chunks WHERE document_id = ?),
+                    updated_at = ?
+                WHERE id = ?
+                """,
+                (status, content_hash, document_id, datetime.utcnow().isoformat(), document_id),
+            )
+            self._conn.commit()
+
+    def get(self, document_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {self.COLUMNS} FROM documents WHERE id = ?", (document_id,)
+            ).fetchone()
+        return self._row(row) if row else None
+
+    def list(self, namespace: str) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self.COLUMNS} FROM documents WHERE namespace = ? ORDER BY created_at",
+                (namespace,),
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def delete(self, document_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM documents WHERE id = ?", (document_id,))
+            self._conn.commit()
+
+    def namespaces(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT namespace FROM documents")]
+
+    def delete_namespace(self, namespace: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM documents WHERE namespace = ?", (namespace,))
+            self._conn.commit()
@@ -0,0 +1,230 @@
+import os
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+
+
+class EmbeddingCache:
+    """
+
+    Two-tier embedding cache keyed by hash(model, text). Recently used vectors live in an
+    in-memory LRU; everything is persisted in SQLite as float32 blobs and evicted by
+    least-recent access once the on-disk store grows past its size limit.
+
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_memory_entries: int = 10000,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_embeddings_accessed_at ON embeddings (accessed_at)"
+        )
+        self._conn.commit()
+        self._disk_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM embeddings"
+        ).fetchone()[0]
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            disk_keys = []
+            for key in dict.fromkeys(keys):
+                vector = self._memory.get(key)
+                if vector is None:
+                    disk_keys.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                    self.memory_hits += 1
+
+            if disk_keys:
+                rows = []
+                # Stay well under SQLite's bound-parameter limit.
+                for i in range(0, len(disk_keys), 500):
+                    part = disk_keys[i : i + 500]
+                    placeholders = ",".join("?" * len(part))
+                    rows.extend(
+                        self._conn.execute(
+                            f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                            part,
+                        ).fetchall()
+                    )
+                now = time.time()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    found[key] = vector
+                    self._remember(key, vector)
+                self.disk_hits += len(rows)
+                self.misses += len(disk_keys) - len(rows)
+                if rows:
+                    self._conn.executemany(
+                        "UPDATE embeddings SET accessed_at = ? WHERE key = ?",
+                        [(now, key) for key, _ in rows],
+                    )
+                    self._conn.commit()
+
+        return {key: vector.tolist() for key, vector in found.items()}
+
+    def put_many(self, items: Dict[str, List[float]]):
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            rows = []
+            for key, values in items.items():
+                vector = np.asarray(values, dtype=np.float32)
+                self._remember(key, vector)
+                blob = vector.tobytes()
+                rows.append((key, blob, len(blob), now))
+
+            previous = 0
+            for i in range(0, len(rows), 500):
+                part = [row[0] for row in rows[i : i + 500]]
+                placeholders = ",".join("?" * len(part))
+                previous += self._conn.execute(
+                    f"SELECT COALESCE(SUM(size), 0) FROM embeddings WHERE key IN ({placeholders})",
+                    part,
+                ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, size, accessed_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._disk_bytes += sum(row[2] for row in rows) - previous
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        if self._disk_bytes <= self.max_disk_bytes:
+            return
+        # Drop the least recently accessed rows until the store is back under 90% of its limit.
+        target = int(self.max_disk_bytes * 0.9)
+        while self._disk_bytes > target:
+            rows = self._conn.execute(
+                "SELECT key, size FROM embeddings ORDER BY accessed_at LIMIT 256"
+            ).fetchall()
+            if not rows:
+                self._disk_bytes = 0
+                break
+            self._conn.executemany(
+                "DELETE FROM embeddings WHERE key = ?", [(key,) for key, _ in rows]
+            )
+            for key, size in rows:
+                self._memory.pop(key, None)
+                self._disk_bytes -= size
+            self.evictions += len(rows)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": hits / total if total else 0.0,
+            }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+
+    Embeddings wrapper that serves repeated texts from an EmbeddingCache and only
+    sends the misses, deduplicated, to the underlying embeddings client.
+
+    """
+
+    def __init__(self, embeddings, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    @property
+    def model(self) -> str:
+        return self.embeddings.model
+
+    def _lookup(self, texts: List[str]) -> Tuple[List[str], Dict[str, List[float]], Dict[str, str]]:
+        keys = [self.cache.make_key(self.model, text) for text in texts]
+        found = self.cache.get_many(keys)
+        missing = {
+            key: text for key, text in zip(keys, texts) if key not in found
+        }
+        return keys, found, missing
+
+    def _store(self, found: Dict[str, List[float]], missing: Dict[str, str], vectors):
+        fresh = dict(zip(missing.keys(), vectors))
+        self.cache.put_many(fresh)
+        found.update(fresh)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, missing = self._lookup(texts)
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            self._store(found, missing, vectors)
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, missing = await asyncio.to_thread(self._lookup, texts)
+        if missing:
+            vectors = await self.embeddings.aembed_documents(list(missing.values()))
+            await asyncio.to_thread(self._store, found, missing, vectors)
+        return [found[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        keys, found, missing = await asyncio.to_thread(self._lookup, [text])
+        if missing:
+            vector = await self.embeddings.aembed_query(text)
+            await asyncio.to_thread(self._store, found, missing, [vector])
+        return found[keys[0]]
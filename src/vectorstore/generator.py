@@ -1,18 +1,37 @@
-import requests
 import os
-from typing import List
+import json
+import asyncio
+import time
+from typing import AsyncIterator, List, Optional
 from langchain_core.documents import Document
 from langfuse import observe
-from src.config.langfuse import langfuse
+from src.config.upstream import upstream_client
+from src.config.context import context_packer, token_counter
+from src.config.metrics import metrics
 
 ULTRASAFE_API_KEY = os.getenv("ULTRASAFE_API_KEY")
+ULTRASAFE_CHAT_URL = os.getenv(
+    "ULTRASAFE_CHAT_URL", "https://api.us.inc/usf/v1/hiring/chat/completions"
+)
 
 
-@observe(name="generate_answer_with_ultrasafeai")
-def generate_answer_with_ultrasafeai(query: str, context_docs: List[Document]) -> str:
-   
+async def build_chat_payload(
+    query: str,
+    context_docs: List[Document],
+    stream: bool = False,
+    usage: Optional[dict] = None,
+) -> dict:
+    """
+
+    Build the chat-completions payload with the retrieved documents as the only allowed context.
+    The documents are packed into the context token budget in rerank order; token counts of the
+    prompt are written to `usage` when given. Packing and token counting are CPU-bound and run
+    in a worker thread.
+
+    """
 
-    context_text = "\n\n".join([doc.page_content for doc in context_docs])
+    packed_docs, context_tokens = await asyncio.to_thread(context_packer.pack, context_docs)
+    context_text = context_packer.context_text(packed_docs)
 
     system_prompt = f"""
     You are an AI assistant restricted to answering **only** using the context provided below. You must not use external knowledge.
@@ -25,7 +44,18 @@ def generate_answer_with_ultrasafeai(query: str, context_docs: List[Document]) -
     {context_text}
     """
 
-    payload = {
+    if usage is not None:
+        usage.update(
+            {
+                "prompt_tokens": await asyncio.to_thread(
+                    token_counter.count_all, [system_prompt, query]
+                ),
+                "context_tokens": context_tokens,
+                "context_chunks": len(packed_docs),
+            }
+        )
+
+    return {
         "model": "usf1-mini",
         "messages": [
             {"role": "system", "content": system_prompt},
@@ -33,21 +63,68 @@ def generate_answer_with_ultrasafeai(query: str, context_docs: List[Document]) -
         ],
         "temperature": 0.1,
         "web_search": False,
-        "stream": False,
+        "stream": stream,
         "max_tokens": 1000,
     }
 
-    headers = {
+
+def _headers() -> dict:
+    return {
         "Authorization": f"Bearer {ULTRASAFE_API_KEY}",
         "Content-Type": "application/json",
     }
 
-    response = requests.post(
-        "https://api.us.inc/usf/v1/hiring/chat/completions",
-        json=payload,
-        headers=headers,
-    )
 
-    response.raise_for_status()
-    data = response.json()
+@observe(name="generate_answer_with_ultrasafeai")
+async def generate_answer_with_ultrasafeai(
+    query: str, context_docs: List[Document], usage: Optional[dict] = None
+) -> str:
+    usage = {} if usage is None else usage
+    payload = await build_chat_payload(query, context_docs, usage=usage)
+    metrics.observe_prompt_tokens(usage["prompt_tokens"])
+
+    with metrics.stage("generate"):
+        response = await upstream_client.apost(
+            "chat", ULTRASAFE_CHAT_URL, json=payload, headers=_headers()
+        )
+
+        response.raise_for_status()
+        data = response.json()
     return data["choices"][0]["message"]["content"]
+
+
+async def stream_answer_with_ultrasafeai(
+    query: str, context_docs: List[Document], usage: Optional[dict] = None
+) -> AsyncIterator[str]:
+    """
+
+    Stream the answer from the chat-completions endpoint, yielding content deltas as they arrive.
+
+    """
+
+    usage = {} if usage is None else usage
+    payload = await build_chat_payload(query, context_docs, stream=True, usage=usage)
+    metrics.observe_prompt_tokens(usage["prompt_tokens"])
+
+    started = time.perf_counter()
+    first_token = True
+    with metrics.stage("generate_stream"):
+        async with upstream_client.astream(
+            "chat", "POST", ULTRASAFE_CHAT_URL, json=payload, headers=_headers()
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                if not choices:
+                    continue
+                token = (choices[0].get("delta") or {}).get("content")
+                if token:
+                    if first_token:
+                        metrics.observe_stage("generate_first_token", time.perf_counter() - started)
+                        first_token = False
+                    yield token
@@ -1,32 +1,46 @@
 import os
-import uuid
+import asyncio
+import hashlib
+import threading
+import concurrent.futures
 from datetime import datetime
-from typing import List
-import time
-import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, Optional, Set
 from dotenv import load_dotenv
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
-from langchain_pinecone import PineconeVectorStore
 
-from src.vectorstore.loader import load_document
+from src.vectorstore.loader import iter_document, pdf_page_hashes
 from src.vectorstore.utils import clean_text
-from src.config.embedding import embedding_instance
-from src.config.pinecone import index
+from src.config.embedding import get_embedding_instance
+from src.config.vector_index import aget_vector_index
+from src.config.chunk_store import chunk_store
+from src.config.bulk_upsert import bulk_upserter
+from src.config.document_manifest import document_manifest, DELETE_BATCH_SIZE
+from src.config.metrics import metrics
+from src.config.retrieval import VECTOR_METADATA_TEXT
 from langfuse import observe
-from src.config.langfuse import langfuse
 
 
 load_dotenv()
 BATCH_SIZE = 32
-MAX_WORKERS = 4
+# Batches embedded concurrently per document, and upsert workers per document. Each upsert
+# worker merges embedded batches into full-size requests; the requests in flight are limited
+# process-wide by the bulk upserter.
+EMBED_WORKERS = int(os.getenv("INGESTION_EMBED_WORKERS", "4"))
+UPSERT_WORKERS = int(os.getenv("INGESTION_UPSERT_WORKERS", "4"))
+# Chunk batches parsed ahead of the embedding workers, and embedded batches waiting for an
+# upsert worker; bounds ingestion memory.
+QUEUE_SIZE = EMBED_WORKERS * 2
+UPSERT_QUEUE_SIZE = UPSERT_WORKERS * 2
+# Skip unchanged files, and parse only the changed pages of a new PDF version.
+INCREMENTAL_INGESTION = os.getenv("INCREMENTAL_INGESTION", "true").lower() == "true"
 
 
-def process_batch(batch_chunks, vector_store, session_id):
-    """ 
-    Process a batch of document chunks and store them in the vector store.
+async def embed_batch(batch_chunks, namespace) -> List[dict]:
+    """
+    Embed a batch of document chunks, store their text in the chunk store and return the
+    vectors to upsert.
 
     """
 
@@ -34,63 +48,427 @@ def process_batch(batch_chunks, vector_store, session_id):
     metadatas = [chunk.metadata for chunk in batch_chunks]
     batch_ids = [chunk.metadata["chunk_id"] for chunk in batch_chunks]
 
-    embedded_vectors = embedding_instance.embed_documents(texts)
+    with metrics.stage("embed_documents", items=len(texts)):
+        embedded_vectors = await get_embedding_instance().aembed_documents(texts)
 
-    vector_store.index.upsert(
-        vectors=[
-            {"id": id_, "values": embedding, "metadata": {**metadata, "text": text}}
-            for id_, embedding, text, metadata in zip(
-                batch_ids, embedded_vectors, texts, metadatas
-            )
-        ],
-        namespace=session_id,
-    )
+    # The chunk store holds the text for retrieval and keyword search; it is written first so
+    # that every vector found by a query can be resolved to its text.
+    with metrics.stage("chunk_store_write", items=len(batch_chunks)):
+        await asyncio.to_thread(chunk_store.add_chunks, namespace, batch_chunks)
+
+    return [
+        {
+            "id": id_,
+            "values": embedding,
+            "metadata": {**metadata, "text": text} if VECTOR_METADATA_TEXT else metadata,
+        }
+        for id_, embedding, text, metadata in zip(batch_ids, embedded_vectors, texts, metadatas)
+    ]
+
+
+async def upsert_vectors(vectors: List[dict], index, namespace):
+    with metrics.stage("vector_upsert", items=len(vectors)):
+        await bulk_upserter.upsert(index, vectors, namespace=namespace)
+
+
+async def process_batch(batch_chunks, index, namespace):
+    """
+    Process a batch of document chunks and store them in the vector store and the chunk store.
+
+    """
+
+    vectors = await embed_batch(batch_chunks, namespace)
+    await upsert_vectors(vectors, index, namespace)
     return len(batch_chunks)
 
 
-@observe(name="process_and_store")
-def process_and_store(file_path: str, filename: str, session_id: str):
+def clean_pages(pages: Iterable[Document]) -> Iterator[Document]:
+    for page in pages:
+        page.page_content = clean_text(page.page_content)
+        yield page
+
+
+def split_pages(pages: Iterable[Document]) -> Iterator[Document]:
+    # start_index lets the context packer merge overlapping neighbours back together.
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=800, chunk_overlap=100, add_start_index=True
+    )
+    for page in pages:
+        yield from splitter.split_documents([page])
+
+
+def chunk_id_prefix(filename: str) -> str:
+    return hashlib.sha256(filename.encode("utf-8")).hexdigest()[:16] + "#"
+
+
+def make_chunk_id(filename: str, text: str) -> str:
+    """
+    Deterministic chunk ID derived from the source file and the chunk content, so that
+    re-ingesting the same content produces the same IDs. IDs of one file share a prefix.
 
-    """ 
-    Process a document file, split it into chunks,modifying metadata and store them in the vector store.
-    
     """
 
-    docs: List[Document] = load_document(file_path)
-    for doc in docs:
-        doc.page_content = clean_text(doc.page_content)
+    return chunk_id_prefix(filename) + hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
 
-    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
-    chunks = splitter.split_documents(docs)
 
+def annotate_chunks(
+    chunks: Iterable[Document],
+    filename: str,
+    namespace: str,
+    page_chunks: Optional[Dict[int, List[str]]] = None,
+) -> Iterator[Document]:
+    seen = set()
     for chunk in chunks:
+        chunk_id = make_chunk_id(filename, chunk.page_content)
+        if page_chunks is not None:
+            # Recorded before de-duplication, so that every page lists all of its chunks.
+            page_chunks.setdefault(chunk.metadata.get("page", 0), []).append(chunk_id)
+        if chunk_id in seen:
+            # Identical text repeated within the file; one vector is enough.
+            continue
+        seen.add(chunk_id)
         chunk.metadata.update(
             {
-                "session_id": session_id,
-                "chunk_id": str(uuid.uuid4()),
+                "namespace": namespace,
+                "chunk_id": chunk_id,
                 "filename": filename,
                 "timestamp": datetime.utcnow().isoformat(),
             }
         )
+        yield chunk
+
+
+def skip_existing(
+    chunks: Iterable[Document],
+    existing_ids: Set[str],
+    counts: dict,
+    namespace: str = None,
+    missing_text_ids: Set[str] = frozenset(),
+) -> Iterator[Document]:
+    """
+    Drop chunks that are already in the vector index. Those of them listed in missing_text_ids
+    were stored before the chunk store existed; their text is written to it here, batch by
+    batch, so that keyword search can find them.
+
+    """
+
+    backfill = []
+    backfilled = 0
+    for chunk in chunks:
+        chunk_id = chunk.metadata["chunk_id"]
+        if chunk_id not in existing_ids:
+            yield chunk
+            continue
+        counts["chunks_reused"] += 1
+        if chunk_id in missing_text_ids:
+            backfill.append(chunk)
+            if len(backfill) == BATCH_SIZE:
+                chunk_store.add_chunks(namespace, backfill)
+                backfilled += len(backfill)
+                backfill = []
+    if backfill:
+        chunk_store.add_chunks(namespace, backfill)
+        backfilled += len(backfill)
+    if backfilled:
+        print(f"📝 Added {backfilled} reused chunks missing from the chunk store.")
+
+
+async def fetch_existing_ids(index, namespace: str, prefix: str) -> Set[str]:
+    """
+    List the IDs already stored in the namespace under the given ID prefix.
+
+    """
+
+    existing_ids = set()
+    with metrics.stage("list_existing_ids"):
+        async for ids in index.list(prefix=prefix, namespace=namespace):
+            existing_ids.update(ids)
+    return existing_ids
+
+
+def batch_chunks(chunks: Iterable[Document], size: int) -> Iterator[List[Document]]:
+    batch = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_chunk_batches(
+    file_path: str,
+    filename: str,
+    namespace: str,
+    existing_ids: Set[str] = frozenset(),
+    counts: dict = None,
+    page_chunks: Optional[Dict[int, List[str]]] = None,
+    pages: Optional[List[int]] = None,
+    missing_text_ids: Set[str] = frozenset(),
+) -> Iterator[List[Document]]:
+    """
+    Lazily load, clean and split a document file, yielding batches of new chunks with metadata.
+    Chunks whose IDs are in existing_ids are skipped and counted in counts["chunks_reused"].
+    If given, page_chunks collects the IDs of all chunks of each page, new or not, and `pages`
+    limits a PDF to the given page numbers. Skipped chunks in missing_text_ids are added to
+    the chunk store.
+    Only the pages and chunks of the batch being built are held in memory.
+
+    """
 
-    vector_store = PineconeVectorStore(
-        index=index, embedding=embedding_instance, namespace=session_id
+    if counts is None:
+        counts = {"chunks_reused": 0}
+    documents = iter_document(file_path, pages)
+    chunks = annotate_chunks(
+        split_pages(clean_pages(documents)), filename, namespace, page_chunks
     )
+    return batch_chunks(
+        skip_existing(chunks, existing_ids, counts, namespace, missing_text_ids), BATCH_SIZE
+    )
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+async def delete_chunks(index, namespace: str, chunk_ids: List[str], document_id: str = None):
+    """
+    Delete chunks by ID from the vector index and the chunk store, DELETE_BATCH_SIZE IDs per
+    request, and drop them from the document's manifest entry batch by batch.
+
+    """
+
+    for i in range(0, len(chunk_ids), DELETE_BATCH_SIZE):
+        part = chunk_ids[i : i + DELETE_BATCH_SIZE]
+        with metrics.stage("vector_delete", items=len(part)):
+            await index.delete(ids=part, namespace=namespace)
+        await asyncio.to_thread(chunk_store.delete_chunks, namespace, part)
+        if document_id:
+            await asyncio.to_thread(document_manifest.remove_chunks, document_id, part)
+
+
+async def delete_document(document_id: str):
+    """
+    Delete a document's chunks by the IDs recorded in the manifest, then its manifest entry.
+    The cost grows with the size of the document, not of its namespace.
+
+    """
+
+    document = await asyncio.to_thread(document_manifest.get, document_id)
+    if not document:
+        return
+    chunk_ids = await asyncio.to_thread(document_manifest.chunk_ids, document_id)
+    await delete_chunks(await aget_vector_index(), document["namespace"], chunk_ids, document_id)
+    await asyncio.to_thread(document_manifest.delete, document_id)
+
+
+@observe(name="process_and_store")
+async def process_and_store(
+    file_path: str, filename: str, namespace: str, on_progress=None
+):
+
+    """
+    Process a document file, split it into chunks,modifying metadata and store them in the vector store.
+    If given, the async on_progress callback receives chunk and batch counts as they change.
+    Chunks already stored in the namespace are neither embedded nor upserted again; the
+    returned summary reports how many chunks were new and how many were reused.
+    The chunk IDs are recorded in the document manifest; uploading a file under the name of an
+    existing document replaces it, deleting the chunks that are no longer part of it at the end.
+    In incremental mode, a file identical to the stored version is skipped, and a new version
+    of a PDF only has the pages whose content hash changed parsed and chunked; the chunks of
+    unchanged pages are taken from the manifest.
 
-    batches = [chunks[i : i + BATCH_SIZE] for i in range(0, len(chunks), BATCH_SIZE)]
+    Parsing runs in a worker thread and feeds a bounded queue of chunk batches, so embedding and
+    upserting start while later pages are still being parsed and memory stays flat with file size.
 
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        """ 
-        Process document chunks in parallel using a thread pool.
-        
-        """
-        futures = [
-            executor.submit(process_batch, batch, vector_store, session_id)
-            for batch in batches
-        ]
+    """
+
+    loop = asyncio.get_running_loop()
+    batch_queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    upsert_queue: asyncio.Queue = asyncio.Queue(maxsize=UPSERT_QUEUE_SIZE)
+    stop = threading.Event()
+
+    index = await aget_vector_index()
+    progress = {"chunks_embedded": 0, "chunks_reused": 0, "batches_upserted": 0}
+    content_hash = await asyncio.to_thread(file_sha256, file_path)
+    previous = await asyncio.to_thread(document_manifest.find, namespace, filename)
+    previous_complete = previous is not None and previous["status"] == "ready"
+
+    # A completely ingested previous version lists its chunk IDs in the manifest; otherwise the
+    # index is listed under the file's ID prefix.
+    if previous_complete:
+        existing_ids = set(await asyncio.to_thread(document_manifest.chunk_ids, previous["id"]))
+    else:
+        existing_ids = await fetch_existing_ids(index, namespace, chunk_id_prefix(filename))
+    # Vectors upserted before the chunk store existed have no text there; the parser fills it in
+    # from the re-parsed chunks, whose text is exactly what their IDs were derived from.
+    missing_text_ids = existing_ids - await asyncio.to_thread(
+        chunk_store.stored_ids, namespace, list(existing_ids)
+    )
+
+    if (
+        INCREMENTAL_INGESTION
+        and previous_complete
+        and previous["content_hash"] == content_hash
+        and not missing_text_ids
+    ):
+        # Same file as the stored version: nothing to parse, embed or delete.
+        progress["chunks_reused"] = previous["chunks"]
+        if on_progress:
+            await on_progress(chunks_total=previous["chunks"], **progress)
+        print(f"✅ {filename} is unchanged: {previous['chunks']} chunks reused.")
+        return {
+            "document_id": previous["id"],
+            "chunks_total": previous["chunks"],
+            "chunks_new": 0,
+            "chunks_reused": previous["chunks"],
+            "chunks_removed": 0,
+            "pages_reused": 0,
+        }
+
+    document_id = await asyncio.to_thread(document_manifest.begin, namespace, filename)
+
+    page_hashes: Dict[int, str] = {}
+    reused_pages: Dict[int, tuple] = {}
+    if INCREMENTAL_INGESTION and os.path.splitext(file_path)[1].lower() == ".pdf":
+        page_hashes = await asyncio.to_thread(pdf_page_hashes, file_path)
+        if previous_complete:
+            stored_pages = await asyncio.to_thread(document_manifest.pages, document_id)
+            reused_pages = {
+                page: stored_pages[page]
+                for page, page_hash in page_hashes.items()
+                if page in stored_pages
+                and stored_pages[page][0] == page_hash
+                and existing_ids.issuperset(stored_pages[page][1])
+                and missing_text_ids.isdisjoint(stored_pages[page][1])
+            }
+    parse_pages = [page for page in page_hashes if page not in reused_pages] if reused_pages else None
+    progress["chunks_reused"] = len({i for _, ids in reused_pages.values() for i in ids})
+
+    # The chunk IDs of each parsed page of this version, filled in by the parser thread.
+    page_chunks: Dict[int, List[str]] = {}
+
+    def produce():
+        # Blocks on the bounded queue so that parsing never runs far ahead of embedding.
+        for batch in iter_chunk_batches(
+            file_path,
+            filename,
+            namespace,
+            existing_ids,
+            progress,
+            page_chunks,
+            parse_pages,
+            missing_text_ids,
+        ):
+            future = asyncio.run_coroutine_threadsafe(batch_queue.put(batch), loop)
+            while True:
+                try:
+                    future.result(timeout=0.5)
+                    break
+                except concurrent.futures.TimeoutError:
+                    if stop.is_set():
+                        future.cancel()
+                        return
 
-        for i, future in enumerate(as_completed(futures), start=1):
-            result = future.result()
-            print(f"✅ Uploaded batch {i}: {result} chunks")
+    async def embed():
+        while True:
+            batch = await batch_queue.get()
+            if batch is None:
+                return
+            await upsert_queue.put(await embed_batch(batch, namespace))
 
-    print("✅ All chunks processed and uploaded.")
+    async def flush(vectors: List[dict]):
+        await upsert_vectors(vectors, index, namespace)
+        await asyncio.to_thread(
+            document_manifest.add_chunks, document_id, [vector["id"] for vector in vectors]
+        )
+        progress["chunks_embedded"] += len(vectors)
+        progress["batches_upserted"] += 1
+        print(f"✅ Uploaded batch {progress['batches_upserted']}: {len(vectors)} chunks")
+        if on_progress:
+            await on_progress(**progress)
+
+    async def upsert():
+        # Embedded batches are small next to the request limits, so they are collected until
+        # the next one would no longer fit in a single request, and sent together.
+        pending, pending_bytes = [], 0
+        while True:
+            vectors = await upsert_queue.get()
+            if vectors is None:
+                if pending:
+                    await flush(pending)
+                return
+            size = bulk_upserter.request_bytes(vectors)
+            if pending and not bulk_upserter.fits(len(pending) + len(vectors), pending_bytes + size):
+                await flush(pending)
+                pending, pending_bytes = [], 0
+            pending.extend(vectors)
+            pending_bytes += size
+
+    async def feed():
+        await asyncio.to_thread(produce)
+        for _ in range(EMBED_WORKERS):
+            await batch_queue.put(None)
+
+    async def embed_stage():
+        await asyncio.gather(*(embed() for _ in range(EMBED_WORKERS)))
+        for _ in range(UPSERT_WORKERS):
+            await upsert_queue.put(None)
+
+    # Embedding and upserting run as separate stages with their own concurrency, so slow
+    # upserts do not hold up embedding and the other way round.
+    # The first failure in any stage stops the parser and cancels the other stages.
+    tasks = [asyncio.create_task(feed()), asyncio.create_task(embed_stage())] + [
+        asyncio.create_task(upsert()) for _ in range(UPSERT_WORKERS)
+    ]
+    try:
+        with metrics.stage("ingest_document"):
+            await asyncio.gather(*tasks)
+    except BaseException as e:
+        stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if not isinstance(e, asyncio.CancelledError):
+            await asyncio.to_thread(document_manifest.finish, document_id, "failed")
+        raise
+
+    # Reused chunks belong to this version too. Chunks of the previous version, recorded in the
+    # manifest or found under the file's ID prefix, that are not part of it are deleted.
+    pages = {page: (page_hash, []) for page, page_hash in page_hashes.items()}
+    pages.update(
+        {page: (page_hashes.get(page, content_hash), ids) for page, ids in page_chunks.items()}
+    )
+    pages.update(reused_pages)
+    chunk_ids = {chunk_id for _, ids in pages.values() for chunk_id in ids}
+    await asyncio.to_thread(document_manifest.add_chunks, document_id, chunk_ids)
+    previous_ids = set(await asyncio.to_thread(document_manifest.chunk_ids, document_id))
+    stale_ids = sorted((previous_ids | existing_ids) - chunk_ids)
+    if stale_ids:
+        await delete_chunks(index, namespace, stale_ids, document_id)
+        print(f"🗑️ Removed {len(stale_ids)} chunks of the previous version of {filename}.")
+    await asyncio.to_thread(document_manifest.set_pages, document_id, pages)
+    await asyncio.to_thread(document_manifest.finish, document_id, "ready", content_hash)
+
+    chunks_total = len(chunk_ids)
+    progress["chunks_reused"] = chunks_total - progress["chunks_embedded"]
+    if on_progress:
+        await on_progress(chunks_total=chunks_total, **progress)
+
+    print(
+        f"✅ All chunks processed and uploaded: {progress['chunks_embedded']} new, "
+        f"{progress['chunks_reused']} reused, {len(reused_pages)} pages unchanged."
+    )
+    return {
+        "document_id": document_id,
+        "chunks_total": chunks_total,
+        "chunks_new": progress["chunks_embedded"],
+        "chunks_reused": progress["chunks_reused"],
+        "chunks_removed": len(stale_ids),
+        "pages_reused": len(reused_pages),
+    }
@@ -1,5 +1,13 @@
 import os
-from typing import List
+import hashlib
+import multiprocessing
+from datetime import datetime
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Collection, Dict, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
 from langchain_community.document_loaders import (
     PyPDFLoader,
     UnstructuredWordDocumentLoader,
@@ -8,25 +16,250 @@ from langchain_community.document_loaders import (
 from langchain_core.documents import Document
 
 
-def load_document(file_path: str) -> List[Document]:
+load_dotenv()
+# PDFs with at least this many pages are parsed across a process pool, smaller files in-process.
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+# Word files at least this large are parsed in a pool process to keep the CPU work off the server.
+WORD_PARALLEL_MIN_BYTES = int(os.getenv("WORD_PARALLEL_MIN_BYTES", str(1024 * 1024)))
+PARSER_PROCESSES = int(
+    os.getenv(
+        "PARSER_PROCESSES",
+        str(len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1),
+    )
+)
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        # Spawned workers do not inherit the server's threads and event loop.
+        _process_pool = ProcessPoolExecutor(
+            max_workers=PARSER_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _process_pool
+
+
+def shutdown_process_pool():
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
+
+
+def pdf_metadata(reader: PdfReader, file_path: str) -> Dict[str, Any]:
+
+    """
+
+    Document-level metadata of a PDF, normalized like PyPDFLoader does it: keys lose their
+    leading slash and are lower-cased, PDF dates become ISO timestamps and other values strings.
+
+    """
+
+    raw = {"producer": "PyPDF", "creator": "PyPDF", "creationdate": ""} | dict(reader.metadata or {})
+    metadata = {}
+    for key, value in raw.items():
+        key = key.lstrip("/").lower()
+        value = value if type(value) in (str, int) else str(value)
+        if key in ("creationdate", "moddate") and isinstance(value, str):
+            try:
+                value = datetime.strptime(value.replace("'", ""), "D:%Y%m%d%H%M%S%z").isoformat("T")
+            except ValueError:
+                pass
+        metadata[key] = value.strip() if isinstance(value, str) else value
+    return metadata | {"source": file_path, "total_pages": len(reader.pages)}
+
+
+def parse_pdf_pages(file_path: str, start: int, end: int) -> List[Document]:
+
+    """
+
+    Parse pages [start, end) of a PDF into Document objects with the same text extraction
+    and metadata as PyPDFLoader. Runs inside a pool worker process.
+
+    """
+
+    reader = PdfReader(file_path)
+    doc_metadata = pdf_metadata(reader, file_path)
+    return [
+        Document(
+            page_content=reader.pages[page_number]
+            .extract_text(extraction_mode="plain")
+            .strip(),
+            metadata=doc_metadata
+            | {"page": page_number, "page_label": reader.page_labels[page_number]},
+        )
+        for page_number in range(start, end)
+    ]
+
+
+def parse_word_document(file_path: str) -> List[Document]:
+    return UnstructuredWordDocumentLoader(file_path).load()
+
+
+def page_ranges(page_numbers: Collection[int], size: int) -> List[Tuple[int, int]]:
+    """
+
+    Group page numbers into [start, end) ranges of consecutive pages, at most `size` pages each.
+
+    """
+
+    ranges = []
+    for page_number in sorted(page_numbers):
+        if ranges and ranges[-1][1] == page_number and page_number - ranges[-1][0] < size:
+            ranges[-1] = (ranges[-1][0], page_number + 1)
+        else:
+            ranges.append((page_number, page_number + 1))
+    return ranges
+
+
+def iter_pdf_parallel(file_path: str, ranges: List[Tuple[int, int]]) -> Iterator[Document]:
+
+    """
+
+    Parse the page ranges of a PDF across the process pool and yield their pages in order.
+    Only a bounded number of ranges is in flight, so memory does not grow with the file.
+
+    """
+
+    executor = get_process_pool()
+    ranges = iter(ranges)
+    pending = deque()
+
+    def submit_next():
+        page_range = next(ranges, None)
+        if page_range:
+            pending.append(executor.submit(parse_pdf_pages, file_path, *page_range))
+
+    try:
+        for _ in range(PARSER_PROCESSES * 2):
+            submit_next()
+        while pending:
+            pages = pending.popleft().result()
+            submit_next()
+            yield from pages
+    finally:
+        for future in pending:
+            future.cancel()
 
-    """ 
-    
-    Load a document from the specified file path with different loaders based on file type 
-    and return it as a list of Document objects. 
+
+def iter_pdf_pages(file_path: str, page_numbers: Collection[int]) -> Iterator[Document]:
+    ranges = page_ranges(page_numbers, PDF_PAGES_PER_TASK)
+    if PARSER_PROCESSES > 1 and len(page_numbers) >= PDF_PARALLEL_MIN_PAGES:
+        return iter_pdf_parallel(file_path, ranges)
+    return (page for start, end in ranges for page in parse_pdf_pages(file_path, start, end))
+
+
+def hash_pdf_object(obj, digest, memo: Dict[int, bytes], active: set):
+
+    """
+
+    Feed a PDF object into the digest, resolving references and recursing into dictionaries,
+    arrays and streams (including their data). Shared objects such as fonts are hashed once
+    per file through `memo`; a reference back into an object being hashed is fed as its number.
+
+    """
+
+    if isinstance(obj, IndirectObject):
+        key = obj.idnum
+        if key in active:
+            digest.update(b"R%d" % key)
+            return
+        if key not in memo:
+            active.add(key)
+            inner = hashlib.sha256()
+            hash_pdf_object(obj.get_object(), inner, memo, active)
+            active.discard(key)
+            memo[key] = inner.digest()
+        digest.update(memo[key])
+    elif isinstance(obj, DictionaryObject):
+        digest.update(b"<<")
+        for key in sorted(obj):
+            if key == "/Parent":
+                continue
+            digest.update(key.encode("utf-8"))
+            hash_pdf_object(obj.raw_get(key), digest, memo, active)
+        digest.update(b">>")
+        if isinstance(obj, StreamObject):
+            digest.update(obj.get_data())
+    elif isinstance(obj, ArrayObject):
+        digest.update(b"[")
+        for item in obj:
+            hash_pdf_object(item, digest, memo, active)
+        digest.update(b"]")
+    else:
+        digest.update(repr(obj).encode("utf-8"))
+
+
+def pdf_page_hashes(file_path: str) -> Dict[int, str]:
+
+    """
+
+    Hash the raw content of every page of a PDF: its content stream together with its resolved
+    resources (fonts, images and Form XObjects, recursively), so that a change drawn through a
+    shared resource is detected too. This is much cheaper than extracting text, so unchanged
+    pages of a new version can be found without parsing them.
+
+    """
+
+    reader = PdfReader(file_path)
+    memo: Dict[int, bytes] = {}
+    hashes = {}
+    for page_number, page in enumerate(reader.pages):
+        digest = hashlib.sha256()
+        contents = page.get_contents()
+        if contents is not None:
+            digest.update(contents.get_data())
+        if "/Resources" in page:
+            hash_pdf_object(page.raw_get("/Resources"), digest, memo, set())
+        hashes[page_number] = digest.hexdigest()
+    return hashes
+
+
+def iter_document(file_path: str, pages: Optional[Collection[int]] = None) -> Iterator[Document]:
+
+    """
+
+    Lazily load a document from the specified file path with different loaders based on file type,
+    yielding Document objects one at a time (one per page for PDFs). Large PDFs and Word files
+    are parsed in a process pool. Word files are loaded whole (see below). For PDFs, `pages` limits parsing to the given page numbers.
 
     """
 
     ext = os.path.splitext(file_path)[1].lower()
 
     if ext == ".pdf":
-        return PyPDFLoader(file_path).load()
+        if pages is not None:
+            return iter_pdf_pages(file_path, pages)
+        total_pages = len(PdfReader(file_path).pages)
+        if PARSER_PROCESSES > 1 and total_pages >= PDF_PARALLEL_MIN_PAGES:
+            return iter_pdf_parallel(file_path, page_ranges(range(total_pages), PDF_PAGES_PER_TASK))
+        return PyPDFLoader(file_path).lazy_load()
 
     elif ext in [".doc", ".docx"]:
-        return UnstructuredWordDocumentLoader(file_path).load()
+        # unstructured parses the whole file before yielding its text as a single Document, so
+        # Word files are never streamed; the pool only moves that CPU work off this process.
+        if os.path.getsize(file_path) >= WORD_PARALLEL_MIN_BYTES:
+            return iter(get_process_pool().submit(parse_word_document, file_path).result())
+        return UnstructuredWordDocumentLoader(file_path).lazy_load()
 
     elif ext == ".txt":
-        return TextLoader(file_path, encoding="utf-8").load()
+        return TextLoader(file_path, encoding="utf-8").lazy_load()
 
     else:
         raise ValueError(f"Unsupported file type: {ext}")
+
+
+def load_document(file_path: str) -> List[Document]:
+
+    """
+
+    Load a document from the specified file path with different loaders based on file type
+    and return it as a list of Document objects.
+
+    """
+
+    return list(iter_document(file_path))
@@ -0,0 +1,398 @@
+import os
+import json
+import shutil
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from typing import AsyncIterator, Dict, List, Optional
+
+import numpy as np
+
+from src.vectorstore.vector_index import VectorIndex
+
+
+class LocalNamespace:
+    """
+
+    One namespace of the local index. Normalized float32 vectors are kept densely packed in a
+    memory-mapped file (row i holds the vector of the i-th stored ID), while IDs and metadata live
+    in a SQLite table keyed by row. Deletes move the last row into the freed slot so that exact
+    search is always a single matrix-vector product over the first `count` rows.
+
+    Namespaces with at least `ann_min_vectors` vectors are searched approximately through an
+    inverted-file (IVF) index: rows are clustered with k-means, and a query scans only the rows
+    of the `nprobe` closest clusters. After the namespace changes, the IVF is rebuilt in a
+    background thread; until the new one is ready, queries fall back to exact search.
+
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        name: str,
+        ann_min_vectors: int = 50000,
+        nprobe: int = 8,
+    ):
+        self.directory = directory
+        self.name = name
+        self.ann_min_vectors = ann_min_vectors
+        self.nprobe = nprobe
+        self.lock = threading.RLock()
+
+        os.makedirs(directory, exist_ok=True)
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.conn = sqlite3.connect(os.path.join(directory, "rows.db"), check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS rows (row INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, metadata TEXT)"
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute("INSERT OR IGNORE INTO info (key, value) VALUES ('name', ?)", (name,))
+        self.conn.commit()
+
+        dimension = self.conn.execute("SELECT value FROM info WHERE key = 'dimension'").fetchone()
+        self.dimension: Optional[int] = int(dimension[0]) if dimension else None
+        self.count = self.conn.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+        self.matrix: Optional[np.memmap] = None
+        if self.dimension:
+            self._open_matrix()
+
+        self._ivf: Optional[dict] = None
+        # Incremented on every change; an IVF is only used for the version it was built from.
+        self._version = 0
+        self._building = False
+
+    # --- Storage ---
+
+    def _capacity(self) -> int:
+        if not self.dimension or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (self.dimension * 4)
+
+    def _open_matrix(self):
+        capacity = self._capacity()
+        self.matrix = (
+            np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+            if capacity
+            else None
+        )
+
+    def _ensure_capacity(self, rows: int):
+        capacity = self._capacity()
+        if rows <= capacity:
+            return
+        new_capacity = max(rows, capacity * 2, 1024)
+        if self.matrix is not None:
+            self.matrix.flush()
+            self.matrix = None
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(new_capacity * self.dimension * 4)
+        self._open_matrix()
+
+    def upsert(self, ids: List[str], vectors: List[List[float]], metadatas: List[dict]):
+        if not ids:
+            return
+        array = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(array, axis=1, keepdims=True)
+        array = array / np.where(norms == 0, 1, norms)
+
+        with self.lock:
+            if self.dimension is None:
+                self.dimension = array.shape[1]
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO info (key, value) VALUES ('dimension', ?)",
+                    (str(self.dimension),),
+                )
+            elif array.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Vector dimension {array.shape[1]} does not match namespace dimension {self.dimension}"
+                )
+
+            existing = self._rows_for_ids(ids)
+            rows = []
+            next_row = self.count
+            for id_ in ids:
+                if id_ in existing:
+                    rows.append(existing[id_])
+                else:
+                    existing[id_] = next_row
+                    rows.append(next_row)
+                    next_row += 1
+
+            self._ensure_capacity(next_row)
+            self.matrix[rows] = array
+            self.matrix.flush()
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO rows (row, id, metadata) VALUES (?, ?, ?)",
+                [
+                    (row, id_, json.dumps(metadata or {}))
+                    for row, id_, metadata in zip(rows, ids, metadatas)
+                ],
+            )
+            self.conn.commit()
+            self.count = next_row
+            self._changed()
+
+    def delete(self, ids: List[str]):
+        with self.lock:
+            for id_ in ids:
+                # Looked up one at a time, since each delete may move the last row.
+                found = self.conn.execute("SELECT row FROM rows WHERE id = ?", (id_,)).fetchone()
+                if not found:
+                    continue
+                row = found[0]
+                last = self.count - 1
+                self.conn.execute("DELETE FROM rows WHERE row = ?", (row,))
+                if row != last:
+                    self.matrix[row] = self.matrix[last]
+                    self.conn.execute("UPDATE rows SET row = ? WHERE row = ?", (row, last))
+                self.count = last
+            if self.matrix is not None:
+                self.matrix.flush()
+            self.conn.commit()
+            self._changed()
+
+    def _rows_for_ids(self, ids: List[str]) -> Dict[str, int]:
+        found = {}
+        for i in range(0, len(ids), 500):
+            part = ids[i : i + 500]
+            placeholders = ",".join("?" * len(part))
+            found.update(
+                self.conn.execute(
+                    f"SELECT id, row FROM rows WHERE id IN ({placeholders})", part
+                ).fetchall()
+            )
+        return found
+
+    def list_ids(self, prefix: Optional[str] = None, page_size: int = 100) -> List[List[str]]:
+        with self.lock:
+            if prefix:
+                # Range scan over the unique ID index instead of a LIKE pattern.
+                upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+                cursor = self.conn.execute(
+                    "SELECT id FROM rows WHERE id >= ? AND id < ? ORDER BY id", (prefix, upper)
+                )
+            else:
+                cursor = self.conn.execute("SELECT id FROM rows ORDER BY id")
+            ids = [row[0] for row in cursor.fetchall()]
+        return [ids[i : i + page_size] for i in range(0, len(ids), page_size)]
+
+    def close(self):
+        with self.lock:
+            if self.matrix is not None:
+                self.matrix.flush()
+                self.matrix = None
+            self.conn.close()
+
+    # --- Search ---
+
+    def _changed(self):
+        # Called with the lock held.
+        self._version += 1
+        self._ivf = None
+        self._schedule_ivf()
+
+    def _schedule_ivf(self):
+        # Called with the lock held.
+        if self._building or self.count < self.ann_min_vectors or self.matrix is None:
+            return
+        self._building = True
+        threading.Thread(
+            target=self._rebuild_ivf,
+            args=(self._version, self.matrix, self.count),
+            daemon=True,
+        ).start()
+
+    def _rebuild_ivf(self, version: int, matrix: np.memmap, count: int):
+        # Runs without the lock, so queries and writes go on meanwhile. If the namespace changed
+        # while the clusters were computed, rows may have moved: the result is dropped and the
+        # IVF is built again from the current rows.
+        try:
+            ivf = self._build_ivf(matrix, count)
+        except Exception as e:
+            print(f"[Local index] IVF build failed for {self.name}: {e}")
+            with self.lock:
+                self._building = False
+            return
+        with self.lock:
+            self._building = False
+            if version == self._version:
+                self._ivf = ivf
+            else:
+                self._schedule_ivf()
+
+    def _build_ivf(self, matrix: np.memmap, count: int) -> dict:
+        data = matrix[:count]
+        nlist = max(1, int(np.sqrt(count)))
+        rng = np.random.default_rng(0)
+        sample = data[rng.choice(count, size=min(count, nlist * 40), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(10):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assignment == c]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[c] = centroid / (np.linalg.norm(centroid) or 1)
+
+        assignment = np.empty(count, dtype=np.int32)
+        for start in range(0, count, 65536):
+            block = data[start : start + 65536]
+            assignment[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(nlist + 1))
+        return {"centroids": centroids, "order": order, "bounds": bounds}
+
+    def _candidate_rows(self, query: np.ndarray) -> Optional[np.ndarray]:
+        if self.count < self.ann_min_vectors:
+            return None
+        if self._ivf is None:
+            # Exact search until the background build has finished.
+            self._schedule_ivf()
+            return None
+        ivf = self._ivf
+        nprobe = min(self.nprobe, len(ivf["centroids"]))
+        probes = np.argpartition(-(ivf["centroids"] @ query), nprobe - 1)[:nprobe]
+        return np.concatenate(
+            [ivf["order"][ivf["bounds"][c] : ivf["bounds"][c + 1]] for c in probes]
+        )
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        include_metadata: bool = True,
+        include_values: bool = False,
+    ) -> List[dict]:
+        with self.lock:
+            if not self.count or self.matrix is None:
+                return []
+            query = np.asarray(vector, dtype=np.float32)
+            query = query / (np.linalg.norm(query) or 1)
+
+            candidates = self._candidate_rows(query)
+            if candidates is not None and not len(candidates):
+                # Every probed cluster is empty.
+                return []
+            if candidates is None:
+                scores = self.matrix[: self.count] @ query
+                rows = np.arange(self.count)
+            else:
+                scores = self.matrix[np.sort(candidates)] @ query
+                rows = np.sort(candidates)
+
+            k = min(top_k, len(scores))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+            top = top[np.argsort(-scores[top])]
+            top_rows = [int(rows[i]) for i in top]
+
+            placeholders = ",".join("?" * len(top_rows))
+            records = {
+                row: (id_, metadata)
+                for row, id_, metadata in self.conn.execute(
+                    f"SELECT row, id, metadata FROM rows WHERE row IN ({placeholders})", top_rows
+                ).fetchall()
+            }
+            return [
+                {
+                    "id": records[row][0],
+                    "score": float(scores[i]),
+                    "metadata": json.loads(records[row][1]) if include_metadata else {},
+                    "values": self.matrix[row].tolist() if include_values else [],
+                }
+                for i, row in zip(top, top_rows)
+            ]
+
+
+class LocalVectorIndex(VectorIndex):
+    """
+
+    In-process VectorIndex that keeps one LocalNamespace per namespace under a base directory.
+    Exact cosine top-k uses argpartition over the memory-mapped matrix; large namespaces switch
+    to an approximate IVF search. Blocking work runs in a worker thread.
+
+    """
+
+    def __init__(self, base_dir: str, ann_min_vectors: int = 50000, nprobe: int = 8):
+        self.base_dir = base_dir
+        self.ann_min_vectors = ann_min_vectors
+        self.nprobe = nprobe
+        self._namespaces: Dict[str, LocalNamespace] = {}
+        self._lock = threading.Lock()
+        os.makedirs(base_dir, exist_ok=True)
+
+    def _directory(self, name: str) -> str:
+        return os.path.join(self.base_dir, hashlib.sha256(name.encode("utf-8")).hexdigest()[:32])
+
+    def namespace(self, name: str) -> LocalNamespace:
+        with self._lock:
+            if name not in self._namespaces:
+                self._namespaces[name] = LocalNamespace(
+                    self._directory(name), name, self.ann_min_vectors, self.nprobe
+                )
+            return self._namespaces[name]
+
+    def _namespace_names(self) -> List[str]:
+        names = []
+        for entry in os.scandir(self.base_dir):
+            rows_path = os.path.join(entry.path, "rows.db")
+            if not entry.is_dir() or not os.path.exists(rows_path):
+                continue
+            conn = sqlite3.connect(rows_path)
+            try:
+                found = conn.execute("SELECT value FROM info WHERE key = 'name'").fetchone()
+            finally:
+                conn.close()
+            if found:
+                names.append(found[0])
+        return names
+
+    def _call(self, name: str, method: str, *args):
+        # Opening a namespace reads its files, so it is resolved in the worker thread too.
+        return getattr(self.namespace(name), method)(*args)
+
+    def _delete_namespace(self, name: str):
+        with self._lock:
+            namespace = self._namespaces.pop(name, None)
+        if namespace is not None:
+            namespace.close()
+        shutil.rmtree(self._directory(name), ignore_errors=True)
+
+    async def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        namespace: str,
+        include_metadata: bool = True,
+        include_values: bool = False,
+    ) -> dict:
+        matches = await asyncio.to_thread(
+            self._call, namespace, "query", vector, top_k, include_metadata, include_values
+        )
+        return {"matches": matches}
+
+    async def upsert(self, vectors: List[dict], namespace: str):
+        await asyncio.to_thread(
+            self._call,
+            namespace,
+            "upsert",
+            [v["id"] for v in vectors],
+            [v["values"] for v in vectors],
+            [v.get("metadata") or {} for v in vectors],
+        )
+
+    async def list(self, namespace: str, prefix: Optional[str] = None) -> AsyncIterator[List[str]]:
+        pages = await asyncio.to_thread(self._call, namespace, "list_ids", prefix)
+        for ids in pages:
+            yield ids
+
+    async def delete(self, ids: List[str], namespace: str):
+        await asyncio.to_thread(self._call, namespace, "delete", ids)
+
+    async def list_namespaces(self) -> List[str]:
+        return await asyncio.to_thread(self._namespace_names)
+
+    async def delete_namespace(self, namespace: str):
+        await asyncio.to_thread(self._delete_namespace, namespace)
@@ -0,0 +1,147 @@
+import time
+import asyncio
+from contextlib import ExitStack, contextmanager
+from typing import Iterator, Optional
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+ITEM_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class StageMetrics:
+    """
+
+    Prometheus instruments for the RAG pipeline stages and the upstream APIs, kept in their own
+    registry. stage() records a latency histogram, an in-flight gauge, an error counter and,
+    when given, the number of items handled; with OpenTelemetry enabled it also opens a span.
+    Each observation is a few dictionary lookups and lock-protected additions.
+
+    """
+
+    def __init__(self, enabled: bool = True, otel_spans: bool = False):
+        self.enabled = enabled
+        self.registry = CollectorRegistry()
+        self.tracer = None
+        if otel_spans:
+            from opentelemetry import trace
+
+            self.tracer = trace.get_tracer("rag-pipeline")
+
+        self.stage_duration = Histogram(
+            "rag_stage_duration_seconds",
+            "Latency of a pipeline stage",
+            ["stage"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+        self.stage_errors = Counter(
+            "rag_stage_errors_total",
+            "Pipeline stage calls that raised",
+            ["stage"],
+            registry=self.registry,
+        )
+        self.stage_in_flight = Gauge(
+            "rag_stage_in_flight",
+            "Pipeline stage calls in progress",
+            ["stage"],
+            registry=self.registry,
+        )
+        self.stage_items = Histogram(
+            "rag_stage_items",
+            "Items (texts, vectors, chunks) handled per stage call",
+            ["stage"],
+            buckets=ITEM_BUCKETS,
+            registry=self.registry,
+        )
+        self.dropped_matches = Counter(
+            "rag_dropped_matches_total",
+            "Search matches dropped because no text was found for them",
+            ["stage"],
+            registry=self.registry,
+        )
+        self.prompt_tokens = Histogram(
+            "rag_prompt_tokens",
+            "Prompt tokens sent to the chat model",
+            buckets=(250, 500, 1000, 2000, 3000, 4000, 6000, 8000, 16000),
+            registry=self.registry,
+        )
+        self.upstream_requests = Counter(
+            "rag_upstream_requests_total",
+            "Upstream API responses by endpoint and status code (or 'error' for transport failures)",
+            ["endpoint", "status"],
+            registry=self.registry,
+        )
+        self.upstream_request_bytes = Histogram(
+            "rag_upstream_request_bytes",
+            "Upstream API request body size",
+            ["endpoint"],
+            buckets=BYTE_BUCKETS,
+            registry=self.registry,
+        )
+        self.upstream_response_bytes = Histogram(
+            "rag_upstream_response_bytes",
+            "Upstream API response body size",
+            ["endpoint"],
+            buckets=BYTE_BUCKETS,
+            registry=self.registry,
+        )
+
+    @contextmanager
+    def stage(self, name: str, items: Optional[int] = None) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+
+        with ExitStack() as stack:
+            if self.tracer is not None:
+                span = stack.enter_context(self.tracer.start_as_current_span(f"rag.{name}"))
+                if items is not None:
+                    span.set_attribute("rag.items", items)
+            in_flight = self.stage_in_flight.labels(name)
+            in_flight.inc()
+            started = time.perf_counter()
+            try:
+                yield
+            except (asyncio.CancelledError, GeneratorExit):
+                raise
+            except BaseException:
+                self.stage_errors.labels(name).inc()
+                raise
+            finally:
+                self.stage_duration.labels(name).observe(time.perf_counter() - started)
+                in_flight.dec()
+                if items is not None:
+                    self.stage_items.labels(name).observe(items)
+
+    def observe_stage(self, name: str, seconds: float):
+        if self.enabled:
+            self.stage_duration.labels(name).observe(seconds)
+
+    def observe_dropped(self, name: str, count: int):
+        if self.enabled and count:
+            self.dropped_matches.labels(name).inc(count)
+
+    def observe_prompt_tokens(self, tokens: int):
+        if self.enabled:
+            self.prompt_tokens.observe(tokens)
+
+    def observe_upstream(
+        self,
+        endpoint: str,
+        status: str,
+        request_bytes: Optional[int] = None,
+        response_bytes: Optional[int] = None,
+    ):
+        if not self.enabled:
+            return
+        self.upstream_requests.labels(endpoint, status).inc()
+        if request_bytes is not None:
+            self.upstream_request_bytes.labels(endpoint).observe(request_bytes)
+        if response_bytes is not None:
+            self.upstream_response_bytes.labels(endpoint).observe(response_bytes)
+
+    def export(self) -> bytes:
+        return generate_latest(self.registry)
@@ -0,0 +1,176 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple
+
+
+class MicroBatcher:
+    """
+
+    Collects concurrent calls over a short window and hands them to `handler` as one batch.
+    A batch is dispatched `max_wait_ms` after its first item arrives, or as soon as it holds
+    `max_batch_size` items. The handler receives the list of items and returns one result per
+    item, in order; a result that is an Exception instance is raised to its caller only.
+    Batches never span event loops: callers on different loops are collected separately.
+
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        # Keyed by event loop; an entry exists only while that loop has items waiting.
+        self._pending: Dict[asyncio.AbstractEventLoop, List[Tuple[Any, asyncio.Future, float]]] = {}
+        self._timers: Dict[asyncio.AbstractEventLoop, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.items = 0
+        self.max_batch = 0
+        self.total_wait_seconds = 0.0
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(loop, [])
+        pending.append((item, future, time.perf_counter()))
+        if len(pending) >= self.max_batch_size:
+            self._flush(loop)
+        elif loop not in self._timers:
+            self._timers[loop] = loop.call_later(self.max_wait_ms / 1000, self._flush, loop)
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop):
+        timer = self._timers.pop(loop, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(loop, [])
+        if not batch:
+            return
+
+        now = time.perf_counter()
+        self.batches += 1
+        self.items += len(batch)
+        self.max_batch = max(self.max_batch, len(batch))
+        self.total_wait_seconds += sum(now - enqueued_at for _, _, enqueued_at in batch)
+
+        task = loop.create_task(self._dispatch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future, float]]):
+        try:
+            results = await self.handler([item for item, _, _ in batch])
+        except asyncio.CancelledError:
+            for _, future, _ in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (_, future, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch,
+            "avg_wait_ms": 1000 * self.total_wait_seconds / self.items if self.items else 0.0,
+        }
+
+
+class BatchedQueryEmbeddings:
+    """
+
+    Embeddings wrapper that micro-batches concurrent aembed_query calls into shared
+    aembed_documents requests. Other calls are passed through to the wrapped client.
+
+    """
+
+    def __init__(self, embeddings, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.embeddings = embeddings
+        self.batcher = MicroBatcher(self._embed_batch, max_batch_size, max_wait_ms)
+
+    @property
+    def model(self) -> str:
+        return self.embeddings.model
+
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        unique = list(dict.fromkeys(texts))
+        vectors = dict(zip(unique, await self.embeddings.aembed_documents(unique)))
+        return [vectors[text] for text in texts]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.batcher.submit(text)
+
+
+class BatchedReranker:
+    """
+
+    Reranker wrapper that micro-batches concurrent arerank calls. The rerank API scores one
+    query per request, so calls for the same query are merged into a single request over
+    the union of their texts, and calls for different queries are sent concurrently.
+
+    """
+
+    def __init__(self, reranker, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.reranker = reranker
+        self.batcher = MicroBatcher(self._rerank_batch, max_batch_size, max_wait_ms)
+
+    async def _rerank_group(self, query: str, texts: List[str]) -> Dict[str, float]:
+        scores = await self.reranker.arerank_scores(query, texts)
+        return dict(zip(texts, scores))
+
+    async def _rerank_batch(self, items: List[Tuple[str, Tuple[str, ...]]]) -> List[Any]:
+        groups: Dict[str, Dict[str, None]] = {}
+        for query, texts in items:
+            groups.setdefault(query, {}).update(dict.fromkeys(texts))
+        queries = list(groups)
+        results = await asyncio.gather(
+            *(self._rerank_group(query, list(groups[query])) for query in queries),
+            return_exceptions=True,
+        )
+        scores_by_query = dict(zip(queries, results))
+
+        ranked = []
+        for query, texts in items:
+            scores = scores_by_query[query]
+            if isinstance(scores, Exception):
+                ranked.append(scores)
+            else:
+                ranked.append(
+                    sorted(range(len(texts)), key=lambda i: scores[texts[i]], reverse=True)
+                )
+        return ranked
+
+    def rerank(self, query: str, texts: List[str]) -> List[int]:
+        return self.reranker.rerank(query, texts)
+
+    async def arerank_scores(self, query: str, texts: List[str]) -> List[float]:
+        return await self.reranker.arerank_scores(query, texts)
+
+    async def arerank(self, query: str, texts: List[str]) -> List[int]:
+        if not texts:
+            return []
+        return await self.batcher.submit((query, tuple(texts)))
@@ -3,13 +3,19 @@ import time
 from pinecone import Pinecone, ServerlessSpec
 
 
-def get_pinecone_index(
+def ensure_pinecone_index(
     api_key: str,
     index_name: str,
     dimension: int = 1024,
     region: str = "us-east-1",
     cloud: str = "aws",
-):
+) -> str:
+    """
+
+    Create the Pinecone index if it does not exist yet, wait until it is ready and return its host.
+
+    """
+
     pc = Pinecone(api_key=api_key)
 
     if index_name not in [index_info["name"] for index_info in pc.list_indexes()]:
@@ -22,4 +28,16 @@ def get_pinecone_index(
         while not pc.describe_index(index_name).status["ready"]:
             time.sleep(1)
 
-    return pc.Index(index_name)
+    return pc.describe_index(index_name).host
+
+
+def get_async_pinecone_index(api_key: str, host: str):
+    """
+
+    Return an asyncio Pinecone index client for the index at `host`, so that the data-plane
+    calls go straight to it.
+
+    """
+
+    pc = Pinecone(api_key=api_key)
+    return pc.IndexAsyncio(host=host)
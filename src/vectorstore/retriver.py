@@ -1,46 +1,144 @@
-from typing import List
+import asyncio
+from typing import Dict, List, Optional
 from langchain_core.documents import Document
 from langfuse import observe
 
-from src.config.embedding import embedding_instance
-from src.config.pinecone import index
-from src.vectorstore.ultrasafe_reranker import UltraSafeAIReranker
-from src.config.reranker import reranker_instance
-from src.config.langfuse import langfuse
+from src.config.embedding import get_embedding_instance
+from src.config.vector_index import aget_vector_index
+from src.config.reranker import get_reranker_instance
+from src.config.chunk_store import chunk_store, HYBRID_SEARCH_ENABLED, RRF_K
+from src.config.retrieval import RETRIEVAL_TOP_K, RETRIEVAL_CANDIDATES
+from src.config.metrics import metrics
 
 
-@observe(name="retrieve_relevant_chunks")
-def retrieve_relevant_chunks(
-    query: str, session_id: str, top_k: int = 5
+async def embed_query(query: str) -> List[float]:
+    with metrics.stage("embed_query"):
+        return await get_embedding_instance().aembed_query(query)
+
+
+async def dense_search(
+    query: str,
+    namespace: str,
+    top_k: int,
+    embedded_query: Optional[List[float]] = None,
 ) -> List[Document]:
-    """ 
-    
-    Retrieve relevant document chunks based on the query using the Pinecone vector store and rerank them using UltraSafeAI.
+    """
+
+    Query the vector index for IDs and scores only, and resolve the chunk text from the chunk store.
+    Vectors stored before the chunk store existed fall back to the text in their metadata;
+    matches with no text in either place are dropped, counted and logged.
 
     """
 
-    embedded_query = embedding_instance.embed_query(query)
+    if embedded_query is None:
+        embedded_query = await embed_query(query)
 
-    search_results = index.query(
-        vector=embedded_query,
-        top_k=top_k,
-        include_metadata=True,
-        include_values=True,
-        namespace=session_id,
-    )
+    index = await aget_vector_index()
+    with metrics.stage("vector_query", items=top_k):
+        search_results = await index.query(
+            vector=embedded_query,
+            top_k=top_k,
+            include_metadata=True,
+            include_values=False,
+            namespace=namespace,
+        )
+    matches = search_results["matches"]
+    with metrics.stage("chunk_lookup", items=len(matches)):
+        stored = await asyncio.to_thread(
+            chunk_store.get_many, namespace, [match["id"] for match in matches]
+        )
 
     documents = []
-    texts = []
-    for match in search_results["matches"]:
+    dropped = []
+    for match in matches:
+        if match["id"] in stored:
+            documents.append(stored[match["id"]])
+        elif match["metadata"].get("text"):
+            documents.append(
+                Document(
+                    id=match["id"],
+                    page_content=match["metadata"]["text"],
+                    metadata=match["metadata"],
+                )
+            )
+        else:
+            dropped.append(match["id"])
+    if dropped:
+        # Usually vectors without chunk store rows; uploading the file again restores them.
+        metrics.observe_dropped("chunk_lookup", len(dropped))
+        print(
+            f"[Dense search] Dropped {len(dropped)} matches without text in {namespace}: "
+            + ", ".join(dropped[:10])
+            + (", ..." if len(dropped) > 10 else "")
+        )
+    return documents
 
-        text = match["metadata"].get("text", "")
-        texts.append(text)
-        documents.append(Document(page_content=text, metadata=match["metadata"]))
 
+async def lexical_search(query: str, namespace: str, top_k: int) -> List[Document]:
     try:
-        ranked_indices = reranker_instance.rerank(query, texts)
-        reranked_documents = [documents[i] for i in ranked_indices]
-        return reranked_documents
+        with metrics.stage("lexical_search", items=top_k):
+            return await asyncio.to_thread(chunk_store.search, namespace, query, top_k)
     except Exception as e:
-        print(f"[Reranking error] {e}. Returning unranked documents.")
-        return documents
+        print(f"[Lexical search error] {e}. Using dense results only.")
+        return []
+
+
+def reciprocal_rank_fusion(
+    result_lists: List[List[Document]], limit: int, k: int = RRF_K
+) -> List[Document]:
+    """
+
+    Fuse ranked result lists with reciprocal rank fusion: each document scores the sum of
+    1 / (k + rank) over the lists it appears in.
+
+    """
+
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Document] = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, start=1):
+            scores[doc.id] = scores.get(doc.id, 0.0) + 1.0 / (k + rank)
+            documents.setdefault(doc.id, doc)
+    ranked = sorted(scores, key=scores.get, reverse=True)[:limit]
+    return [documents[id_] for id_ in ranked]
+
+
+@observe(name="retrieve_relevant_chunks")
+async def retrieve_relevant_chunks(
+    query: str,
+    namespace: str,
+    top_k: int = RETRIEVAL_TOP_K,
+    embedded_query: Optional[List[float]] = None,
+    candidates: int = RETRIEVAL_CANDIDATES,
+) -> List[Document]:
+    """
+
+    Retrieve relevant document chunks in two stages: fetch `candidates` chunks from the configured vector index,
+    rerank them using UltraSafeAI and return the best `top_k`.
+    With hybrid search enabled, dense and BM25 keyword candidates are fetched concurrently and fused with reciprocal rank fusion before reranking.
+
+    """
+
+    with metrics.stage("retrieve"):
+        candidates = max(candidates, top_k)
+        if HYBRID_SEARCH_ENABLED:
+            dense_documents, lexical_documents = await asyncio.gather(
+                dense_search(query, namespace, candidates, embedded_query),
+                lexical_search(query, namespace, candidates),
+            )
+            documents = reciprocal_rank_fusion([dense_documents, lexical_documents], candidates)
+        else:
+            documents = await dense_search(query, namespace, candidates, embedded_query)
+
+        if not documents:
+            return []
+        texts = [doc.page_content for doc in documents]
+
+        try:
+            with metrics.stage("rerank", items=len(texts)):
+                ranked_indices = await get_reranker_instance().arerank(query, texts)
+            reranked_documents = [documents[i] for i in ranked_indices[:top_k]]
+            return reranked_documents
+        except Exception as e:
+            print(f"[Reranking error] {e}. Returning unranked documents.")
+            return documents[:top_k]
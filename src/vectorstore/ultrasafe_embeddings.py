@@ -1,32 +1,219 @@
+import asyncio
+import httpx
 import requests
-from typing import List
+from typing import Dict, List, Optional
 from langchain.embeddings.base import Embeddings
 
+from src.vectorstore.upstream import UpstreamClient
+
+
+# Status codes for which a failed batch is split in half and retried, since the
+# failure is likely caused by a single input or by the size of the payload. Server errors and
+# transport failures are not about the batch; they are retried by the upstream client, and
+# splitting them would only multiply the load on a struggling API.
+SPLIT_RETRY_STATUS_CODES = {400, 413, 422}
+
 
 class UltraSafeAIEmbeddings(Embeddings):
+    """
+
+    UltraSafeAIEmbeddings class for generating embeddings using the UltraSafeAI API.
+    Documents are sent in batches bounded by input count and by an estimated token budget.
+
+    """
+
     def __init__(
         self,
         api_key: str,
         api_url: str = "https://api.us.inc/usf/v1/embed/embeddings",
         model: str = "usf1-embed",
+        max_batch_size: int = 64,
+        max_batch_tokens: int = 8000,
+        max_retries: int = 2,
+        upstream: Optional[UpstreamClient] = None,
     ):
         self.api_key = api_key
         self.api_url = api_url
         self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_retries = max_retries
+        self.upstream = upstream or UpstreamClient()
 
-    def embed_text(self, text: str) -> List[float]:
-        headers = {
+    def _headers(self) -> Dict[str, str]:
+        return {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}",
         }
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        # Roughly four characters per token, which is close enough for batch sizing.
+        return len(text) // 4 + 1
+
+    def embed_text(self, text: str) -> List[float]:
         payload = {"model": self.model, "input": text}
-        response = requests.post(self.api_url, json=payload, headers=headers)
+        response = self.upstream.post(
+            "embeddings", self.api_url, json=payload, headers=self._headers()
+        )
         response.raise_for_status()
         data = response.json()
         return data["result"]["data"][0]["embedding"]
 
+    async def aembed_text(self, text: str) -> List[float]:
+        payload = {"model": self.model, "input": text}
+        response = await self.upstream.apost(
+            "embeddings", self.api_url, json=payload, headers=self._headers()
+        )
+        response.raise_for_status()
+        data = response.json()
+        return data["result"]["data"][0]["embedding"]
+
+    def split_batches(self, texts: List[str]) -> List[List[int]]:
+        """
+
+        Group input positions into batches that respect both the maximum number of inputs
+        and the estimated token budget per request.
+
+        """
+
+        batches = []
+        current: List[int] = []
+        current_tokens = 0
+        for i, text in enumerate(texts):
+            tokens = self.estimate_tokens(text)
+            if current and (
+                len(current) >= self.max_batch_size
+                or current_tokens + tokens > self.max_batch_tokens
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _parse_batch_response(self, data: dict) -> Dict[int, List[float]]:
+        items = data["result"]["data"]
+        return {
+            item.get("index", position): item["embedding"]
+            for position, item in enumerate(items)
+        }
+
+    def _post_batch(self, inputs: List[str]) -> Dict[int, List[float]]:
+        payload = {"model": self.model, "input": inputs}
+        response = self.upstream.post(
+            "embeddings", self.api_url, json=payload, headers=self._headers()
+        )
+        response.raise_for_status()
+        return self._parse_batch_response(response.json())
+
+    async def _apost_batch(self, inputs: List[str]) -> Dict[int, List[float]]:
+        payload = {"model": self.model, "input": inputs}
+        response = await self.upstream.apost(
+            "embeddings", self.api_url, json=payload, headers=self._headers()
+        )
+        response.raise_for_status()
+        return self._parse_batch_response(response.json())
+
+    @staticmethod
+    def _should_split(error: Exception) -> bool:
+        response = getattr(error, "response", None)
+        return response is not None and response.status_code in SPLIT_RETRY_STATUS_CODES
+
+    @staticmethod
+    def _collect_vectors(
+        indices: List[int],
+        vectors: Dict[int, List[float]],
+        out: List[Optional[List[float]]],
+    ) -> List[int]:
+        """
+
+        Place the vectors of a batch response at their input positions and return
+        the positions the API did not answer for.
+
+        """
+
+        missing = []
+        for position, i in enumerate(indices):
+            vector = vectors.get(position)
+            if vector is None:
+                missing.append(i)
+            else:
+                out[i] = vector
+        return missing
+
+    def _embed_batch_into(
+        self,
+        texts: List[str],
+        indices: List[int],
+        out: List[Optional[List[float]]],
+        attempt: int = 0,
+    ):
+        try:
+            vectors = self._post_batch([texts[i] for i in indices])
+        except requests.RequestException as e:
+            if len(indices) == 1 or not self._should_split(e):
+                raise
+            mid = len(indices) // 2
+            self._embed_batch_into(texts, indices[:mid], out, attempt)
+            self._embed_batch_into(texts, indices[mid:], out, attempt)
+            return
+
+        missing = self._collect_vectors(indices, vectors, out)
+        if missing:
+            if attempt >= self.max_retries:
+                raise RuntimeError(
+                    f"Embedding API returned no vectors for {len(missing)} inputs"
+                )
+            self._embed_batch_into(texts, missing, out, attempt + 1)
+
+    async def _aembed_batch_into(
+        self,
+        texts: List[str],
+        indices: List[int],
+        out: List[Optional[List[float]]],
+        attempt: int = 0,
+    ):
+        try:
+            vectors = await self._apost_batch([texts[i] for i in indices])
+        except httpx.HTTPError as e:
+            if len(indices) == 1 or not self._should_split(e):
+                raise
+            mid = len(indices) // 2
+            await asyncio.gather(
+                self._aembed_batch_into(texts, indices[:mid], out, attempt),
+                self._aembed_batch_into(texts, indices[mid:], out, attempt),
+            )
+            return
+
+        missing = self._collect_vectors(indices, vectors, out)
+        if missing:
+            if attempt >= self.max_retries:
+                raise RuntimeError(
+                    f"Embedding API returned no vectors for {len(missing)} inputs"
+                )
+            await self._aembed_batch_into(texts, missing, out, attempt + 1)
+
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        return [self.embed_text(text) for text in texts]
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        for indices in self.split_batches(texts):
+            self._embed_batch_into(texts, indices, embeddings)
+        return embeddings
 
     def embed_query(self, text: str) -> List[float]:
         return self.embed_text(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        await asyncio.gather(
+            *[
+                self._aembed_batch_into(texts, indices, embeddings)
+                for indices in self.split_batches(texts)
+            ]
+        )
+        return embeddings
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.aembed_text(text)
@@ -1,5 +1,6 @@
-import requests
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from src.vectorstore.upstream import UpstreamClient
 
 
 class UltraSafeAIReranker:
@@ -14,27 +15,60 @@ class UltraSafeAIReranker:
         api_key: str,
         api_url: str = "https://api.us.inc/usf/v1/embed/reranker",
         model: str = "usf1-rerank",
+        upstream: Optional[UpstreamClient] = None,
     ):
         self.api_key = api_key
         self.api_url = api_url
         self.model = model
+        self.upstream = upstream or UpstreamClient()
 
-    def rerank(self, query: str, texts: List[str]) -> List[int]:
-        headers = {
+    def _headers(self) -> Dict[str, str]:
+        return {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}",
         }
 
-        payload = {"model": self.model, "query": query, "texts": texts}
-
-        response = requests.post(self.api_url, json=payload, headers=headers)
-        response.raise_for_status()
-        data = response.json()
+    @staticmethod
+    def _sorted_indices(data: dict) -> List[int]:
         # Sort by score descending, return list of indices
-        sorted_indices = [
+        return [
             item["index"]
             for item in sorted(
                 data["result"]["data"], key=lambda x: x["score"], reverse=True
             )
         ]
-        return sorted_indices
+
+    @staticmethod
+    def _scores(data: dict, count: int) -> List[float]:
+        # Score of each input text, by input position
+        scores = [float("-inf")] * count
+        for item in data["result"]["data"]:
+            scores[item["index"]] = item["score"]
+        return scores
+
+    def rerank(self, query: str, texts: List[str]) -> List[int]:
+        payload = {"model": self.model, "query": query, "texts": texts}
+
+        response = self.upstream.post(
+            "reranker", self.api_url, json=payload, headers=self._headers()
+        )
+        response.raise_for_status()
+        return self._sorted_indices(response.json())
+
+    async def arerank(self, query: str, texts: List[str]) -> List[int]:
+        payload = {"model": self.model, "query": query, "texts": texts}
+
+        response = await self.upstream.apost(
+            "reranker", self.api_url, json=payload, headers=self._headers()
+        )
+        response.raise_for_status()
+        return self._sorted_indices(response.json())
+
+    async def arerank_scores(self, query: str, texts: List[str]) -> List[float]:
+        payload = {"model": self.model, "query": query, "texts": texts}
+
+        response = await self.upstream.apost(
+            "reranker", self.api_url, json=payload, headers=self._headers()
+        )
+        response.raise_for_status()
+        return self._scores(response.json(), len(texts))
@@ -0,0 +1,276 @@
+import time
+import random
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.vectorstore.http_client import get_async_http_client
+from src.vectorstore.metrics import StageMetrics
+
+
+# Responses worth retrying after a pause: rate limiting and server-side failures.
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class UpstreamUnavailable(Exception):
+    """
+
+    Raised without calling the endpoint while its circuit breaker is open.
+
+    """
+
+
+class CircuitBreaker:
+    """
+
+    Per-endpoint circuit breaker. After `failure_threshold` consecutive failures the circuit
+    opens and calls fail fast for `reset_timeout` seconds; then a single trial call is let
+    through (half-open), which closes the circuit on success or reopens it on failure.
+
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """
+
+        End a call that says nothing about the endpoint's health (rate limited, cancelled).
+
+        """
+
+        with self._lock:
+            self._trial_in_flight = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"state": self.state, "failures": self.failures, "rejected": self.rejected}
+
+
+class UpstreamClient:
+    """
+
+    Shared client for the UltraSafe APIs. Sync calls go through one pooled keep-alive
+    requests.Session and async calls through the shared httpx client. Every call gets the
+    timeout of its endpoint, is retried on connection errors and RETRY_STATUS_CODES with
+    jittered exponential backoff (or the server's Retry-After), and is guarded by the
+    endpoint's circuit breaker. The final response is returned as-is for the caller to check.
+
+    """
+
+    def __init__(
+        self,
+        timeouts: Optional[Dict[str, float]] = None,
+        default_timeout: float = 60.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0,
+        breaker_threshold: int = 5,
+        breaker_reset_seconds: float = 30.0,
+        pool_maxsize: int = 50,
+        metrics: Optional[StageMetrics] = None,
+    ):
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset_seconds = breaker_reset_seconds
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.metrics = metrics
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        with self._lock:
+            if endpoint not in self.breakers:
+                self.breakers[endpoint] = CircuitBreaker(
+                    endpoint, self.breaker_threshold, self.breaker_reset_seconds
+                )
+            return self.breakers[endpoint]
+
+    def timeout(self, endpoint: str) -> float:
+        return self.timeouts.get(endpoint, self.default_timeout)
+
+    def _admit(self, endpoint: str) -> CircuitBreaker:
+        breaker = self.breaker(endpoint)
+        if not breaker.allow():
+            raise UpstreamUnavailable(f"{endpoint} endpoint is unavailable (circuit open)")
+        return breaker
+
+    @staticmethod
+    def _retry_after(value: Optional[str]) -> Optional[float]:
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def _delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        server_delay = self._retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.backoff_max)
+        # Full jitter keeps retrying callers from hitting the endpoint in lockstep.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def _observe(self, endpoint: str, status, request_body=None, response_body=None):
+        if self.metrics is not None:
+            self.metrics.observe_upstream(
+                endpoint,
+                str(status),
+                len(request_body) if request_body is not None else None,
+                len(response_body) if response_body is not None else None,
+            )
+
+    @staticmethod
+    def _record(breaker: CircuitBreaker, status_code: int):
+        if status_code == 429:
+            breaker.release()
+        elif status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    def post(self, endpoint: str, url: str, **kwargs) -> requests.Response:
+        for attempt in range(self.max_retries + 1):
+            breaker = self._admit(endpoint)
+            try:
+                response = self.session.post(url, timeout=self.timeout(endpoint), **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                breaker.record_failure()
+                self._observe(endpoint, "error")
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+
+            self._record(breaker, response.status_code)
+            self._observe(endpoint, response.status_code, response.request.body, response.content)
+            if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                return response
+            time.sleep(self._delay(attempt, response.headers.get("Retry-After")))
+
+    async def apost(self, endpoint: str, url: str, **kwargs) -> httpx.Response:
+        client = get_async_http_client()
+        for attempt in range(self.max_retries + 1):
+            breaker = self._admit(endpoint)
+            try:
+                response = await client.post(url, timeout=self.timeout(endpoint), **kwargs)
+            except httpx.TransportError:
+                breaker.record_failure()
+                self._observe(endpoint, "error")
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self._delay(attempt))
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+
+            self._record(breaker, response.status_code)
+            self._observe(endpoint, response.status_code, response.request.content, response.content)
+            if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                return response
+            await asyncio.sleep(self._delay(attempt, response.headers.get("Retry-After")))
+
+    @asynccontextmanager
+    async def astream(
+        self, endpoint: str, method: str, url: str, **kwargs
+    ) -> AsyncIterator[httpx.Response]:
+        """
+
+        Open a streaming request. Retries apply only until the response headers arrive; once the
+        body is being consumed, failures are passed to the caller.
+
+        """
+
+        client = get_async_http_client()
+        response = None
+        for attempt in range(self.max_retries + 1):
+            breaker = self._admit(endpoint)
+            request = client.build_request(method, url, timeout=self.timeout(endpoint), **kwargs)
+            try:
+                response = await client.send(request, stream=True)
+            except httpx.TransportError:
+                breaker.record_failure()
+                self._observe(endpoint, "error")
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self._delay(attempt))
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+
+            self._record(breaker, response.status_code)
+            self._observe(endpoint, response.status_code, request.content)
+            if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                break
+            await response.aclose()
+            await asyncio.sleep(self._delay(attempt, response.headers.get("Retry-After")))
+
+        try:
+            yield response
+        finally:
+            await response.aclose()
+
+    def stats(self) -> dict:
+        with self._lock:
+            breakers = list(self.breakers.values())
+        return {breaker.name: breaker.stats() for breaker in breakers}
+
+    def close(self):
+        self.session.close()
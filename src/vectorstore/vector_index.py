@@ -0,0 +1,108 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, List, Optional
+
+
+class VectorIndex(ABC):
+    """
+
+    Backend-agnostic async vector index used by retrieval and ingestion. Implementations follow the
+    Pinecone data-plane calls the pipeline relies on: query, upsert, list (ID pages by prefix) and
+    delete, all scoped to a namespace, plus listing and deleting whole namespaces. Query results are plain dicts of the form
+    {"matches": [{"id": ..., "score": ..., "metadata": {...}, "values": [...]}]}.
+
+    """
+
+    @abstractmethod
+    async def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        namespace: str,
+        include_metadata: bool = True,
+        include_values: bool = False,
+    ) -> dict:
+        ...
+
+    @abstractmethod
+    async def upsert(self, vectors: List[dict], namespace: str):
+        ...
+
+    @abstractmethod
+    def list(self, namespace: str, prefix: Optional[str] = None) -> AsyncIterator[List[str]]:
+        ...
+
+    @abstractmethod
+    async def delete(self, ids: List[str], namespace: str):
+        ...
+
+    @abstractmethod
+    async def list_namespaces(self) -> List[str]:
+        ...
+
+    @abstractmethod
+    async def delete_namespace(self, namespace: str):
+        ...
+
+    async def close(self):
+        pass
+
+
+class PineconeVectorIndex(VectorIndex):
+    """
+
+    VectorIndex backed by a remote Pinecone index through its asyncio client.
+
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+    async def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        namespace: str,
+        include_metadata: bool = True,
+        include_values: bool = False,
+    ) -> dict:
+        results = await self.index.query(
+            vector=vector,
+            top_k=top_k,
+            include_metadata=include_metadata,
+            include_values=include_values,
+            namespace=namespace,
+        )
+        return {
+            "matches": [
+                {
+                    "id": match["id"],
+                    "score": match["score"],
+                    "metadata": match.get("metadata") or {},
+                    "values": match.get("values") or [],
+                }
+                for match in results["matches"]
+            ]
+        }
+
+    async def upsert(self, vectors: List[dict], namespace: str):
+        await self.index.upsert(vectors=vectors, namespace=namespace)
+
+    async def list(self, namespace: str, prefix: Optional[str] = None) -> AsyncIterator[List[str]]:
+        kwargs = {"namespace": namespace}
+        if prefix:
+            kwargs["prefix"] = prefix
+        async for ids in self.index.list(**kwargs):
+            yield ids
+
+    async def delete(self, ids: List[str], namespace: str):
+        await self.index.delete(ids=ids, namespace=namespace)
+
+    async def list_namespaces(self) -> List[str]:
+        stats = await self.index.describe_index_stats()
+        return list((stats.namespaces or {}).keys())
+
+    async def delete_namespace(self, namespace: str):
+        await self.index.delete(delete_all=True, namespace=namespace)
+
+    async def close(self):
+        await self.index.close()
@@ -0,0 +1,105 @@
+"""
+
+Test setup. Like the benchmarks, the UltraSafe APIs are replaced by the local fake server and
+the vector index by the local backend, so the suite runs offline; the application modules read
+their configuration from the environment, which is set here before any of them is imported.
+
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_servers import FakeUltraSafe, free_port  # noqa: E402
+
+
+ULTRASAFE_PORT = free_port()
+WORK_DIR = tempfile.mkdtemp(prefix="rag-tests-")
+
+for key, value in {
+    "ULTRASAFE_API_KEY": "test",
+    "ULTRASAFE_API_EMBEDDINGS_BASE": f"http://127.0.0.1:{ULTRASAFE_PORT}/embeddings",
+    "ULTRASAFE_RERANKER_URL": f"http://127.0.0.1:{ULTRASAFE_PORT}/reranker",
+    "ULTRASAFE_CHAT_URL": f"http://127.0.0.1:{ULTRASAFE_PORT}/chat/completions",
+    "DATABASE_URL": f"sqlite:///{os.path.join(WORK_DIR, 'database.db')}",
+    "VECTOR_BACKEND": "local",
+    "LOCAL_INDEX_DIR": os.path.join(WORK_DIR, "vector_index"),
+    "CHUNK_STORE_PATH": os.path.join(WORK_DIR, "chunks.db"),
+    "DOCUMENT_MANIFEST_PATH": os.path.join(WORK_DIR, "documents.db"),
+    "EMBEDDING_CACHE_ENABLED": "false",
+    "ANSWER_CACHE_ENABLED": "false",
+    "UPSTREAM_BACKOFF_BASE": "0.01",
+    "LANGFUSE_TRACING_ENABLED": "false",
+}.items():
+    os.environ.setdefault(key, value)
+
+
+@pytest.fixture(scope="session")
+def event_loop_runner():
+    """
+
+    Run coroutines on one event loop for the whole session, since the shared HTTP clients
+    are bound to the loop they were created on.
+
+    """
+
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    from src.vectorstore.http_client import close_async_http_client
+
+    loop.run_until_complete(close_async_http_client())
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def ultrasafe_server():
+    server = FakeUltraSafe(port=ULTRASAFE_PORT)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fake_ultrasafe(ultrasafe_server):
+    """
+
+    The fake UltraSafe server with its failure settings and request log reset after the test.
+
+    """
+
+    ultrasafe_server.embedding_batches.clear()
+    yield ultrasafe_server
+    ultrasafe_server.max_embedding_inputs = None
+    ultrasafe_server.embedding_status = None
+
+
+@pytest.fixture
+def session_factory(tmp_path, event_loop_runner):
+    """
+
+    Async session factory for a fresh SQLite database with the app's tables.
+
+    """
+
+    import src.models.user  # noqa: F401
+    import src.models.job  # noqa: F401
+    import src.models.legacy_namespace  # noqa: F401
+    import src.models.namespace_generation  # noqa: F401
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+    event_loop_runner(create())
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    event_loop_runner(engine.dispose())
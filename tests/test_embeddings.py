@@ -0,0 +1,49 @@
+import httpx
+import pytest
+import requests
+
+from benchmarks.fake_servers import fake_vector
+from src.vectorstore.ultrasafe_embeddings import UltraSafeAIEmbeddings
+from src.vectorstore.upstream import UpstreamClient
+
+
+TEXTS = [f"chunk number {i}" for i in range(10)]
+
+
+@pytest.fixture
+def embeddings(fake_ultrasafe):
+    return UltraSafeAIEmbeddings(
+        api_key="test",
+        api_url=f"{fake_ultrasafe.url}/embeddings",
+        upstream=UpstreamClient(max_retries=0),
+    )
+
+
+def test_split_batch_keeps_input_order(embeddings, fake_ultrasafe):
+    fake_ultrasafe.max_embedding_inputs = 3
+
+    vectors = embeddings.embed_documents(TEXTS)
+
+    assert vectors == [fake_vector(text, fake_ultrasafe.dimension) for text in TEXTS]
+    # 10 is rejected, then 5 and 5, each of them again as 2 and 3.
+    assert fake_ultrasafe.embedding_batches == [10, 5, 2, 3, 5, 2, 3]
+
+
+def test_async_split_batch_keeps_input_order(embeddings, fake_ultrasafe, event_loop_runner):
+    fake_ultrasafe.max_embedding_inputs = 3
+
+    vectors = event_loop_runner(embeddings.aembed_documents(TEXTS))
+
+    assert vectors == [fake_vector(text, fake_ultrasafe.dimension) for text in TEXTS]
+    assert sorted(fake_ultrasafe.embedding_batches) == [2, 2, 3, 3, 5, 5, 10]
+
+
+def test_outage_is_not_split(embeddings, fake_ultrasafe, event_loop_runner):
+    fake_ultrasafe.embedding_status = 503
+
+    with pytest.raises(requests.HTTPError):
+        embeddings.embed_documents(TEXTS)
+    with pytest.raises(httpx.HTTPStatusError):
+        event_loop_runner(embeddings.aembed_documents(TEXTS))
+
+    assert fake_ultrasafe.embedding_batches == [10, 10]
@@ -0,0 +1,45 @@
+from benchmarks.documents import make_pdf
+from src.config.document_manifest import document_manifest
+from src.vectorstore.ingestion_pipeline import process_and_store
+
+
+NAMESPACE = "test-incremental"
+
+
+def test_new_pdf_version_reuses_unchanged_pages(tmp_path, fake_ultrasafe, event_loop_runner):
+    path = str(tmp_path / "report.pdf")
+    make_pdf(path, 5)
+    first = event_loop_runner(process_and_store(path, "report.pdf", NAMESPACE))
+    assert first["chunks_new"] == first["chunks_total"] > 0
+    assert first["pages_reused"] == 0
+
+    # The same five pages and one more.
+    make_pdf(path, 6)
+    fake_ultrasafe.embedding_batches.clear()
+    second = event_loop_runner(process_and_store(path, "report.pdf", NAMESPACE))
+
+    assert second["document_id"] == first["document_id"]
+    assert second["pages_reused"] == 5
+    assert second["chunks_reused"] == first["chunks_total"]
+    assert second["chunks_new"] == second["chunks_total"] - first["chunks_total"] > 0
+    assert second["chunks_removed"] == 0
+    assert sum(fake_ultrasafe.embedding_batches) == second["chunks_new"]
+
+    pages = document_manifest.pages(second["document_id"])
+    assert sorted(pages) == list(range(6))
+    assert set(document_manifest.chunk_ids(second["document_id"])) == {
+        chunk_id for _, ids in pages.values() for chunk_id in ids
+    }
+
+
+def test_unchanged_file_is_skipped(tmp_path, fake_ultrasafe, event_loop_runner):
+    path = str(tmp_path / "notes.pdf")
+    make_pdf(path, 2)
+    first = event_loop_runner(process_and_store(path, "notes.pdf", NAMESPACE))
+
+    fake_ultrasafe.embedding_batches.clear()
+    second = event_loop_runner(process_and_store(path, "notes.pdf", NAMESPACE))
+
+    assert second["chunks_new"] == 0
+    assert second["chunks_reused"] == first["chunks_total"]
+    assert fake_ultrasafe.embedding_batches == []
@@ -0,0 +1,182 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import src.jobs.ingestion_queue as ingestion_queue
+from src.jobs.ingestion_queue import IngestionJobQueue
+from src.models.job import IngestionJob
+
+
+@pytest.fixture
+def upload(tmp_path):
+    def store(name):
+        path = tmp_path / name
+        path.write_text("uploaded")
+        return str(path)
+
+    return store
+
+
+@pytest.fixture
+def runs(monkeypatch):
+    """
+
+    Replace document processing with a short sleep, recording which process ran which job
+    and whether two jobs for the same document ever overlapped.
+
+    """
+
+    log = {"runs": [], "active": set(), "overlaps": 0}
+
+    async def fake_process_and_store(file_path, filename, namespace, on_progress=None):
+        key = (namespace, filename)
+        if key in log["active"]:
+            log["overlaps"] += 1
+        log["active"].add(key)
+        log["runs"].append(file_path)
+        await asyncio.sleep(0.05)
+        log["active"].discard(key)
+
+    async def fake_invalidate_answers(namespace):
+        pass
+
+    monkeypatch.setattr(ingestion_queue, "process_and_store", fake_process_and_store)
+    monkeypatch.setattr(ingestion_queue, "invalidate_answers", fake_invalidate_answers)
+    return log
+
+
+async def wait_for(queue, job_ids, timeout=10.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        jobs = [await queue.get(job_id) for job_id in job_ids]
+        if all(job.status in ("completed", "failed") for job in jobs):
+            return jobs
+        assert asyncio.get_running_loop().time() < deadline, [job.status for job in jobs]
+        await asyncio.sleep(0.02)
+
+
+def test_jobs_run_once_and_in_order_across_processes(
+    session_factory, event_loop_runner, runs, upload
+):
+    async def scenario():
+        queues = [
+            IngestionJobQueue(session_factory, workers=2, lease_seconds=5, poll_seconds=0.05)
+            for _ in range(2)
+        ]
+        for queue in queues:
+            await queue.start()
+        try:
+            jobs = []
+            for i in range(4):
+                path = upload(f"v{i}.txt")
+                jobs.append(await queues[i % 2].submit("library", "report.txt", path))
+            other = await queues[0].submit("library", "other.txt", upload("other.txt"))
+            return jobs, await wait_for(queues[0], [job.id for job in jobs + [other]])
+        finally:
+            for queue in queues:
+                await queue.stop()
+
+    jobs, finished = event_loop_runner(scenario())
+
+    assert [job.status for job in finished] == ["completed"] * 5
+    assert all(job.owner is None and job.lease_expires_at is None for job in finished)
+    assert runs["overlaps"] == 0
+    report_runs = [path for path in runs["runs"] if "other" not in path]
+    assert report_runs == [job.file_path for job in jobs]
+
+
+def test_expired_lease_is_resumed(session_factory, event_loop_runner, runs, upload):
+    async def scenario():
+        path = upload("dead.txt")
+        async with session_factory() as db:
+            # Claimed by a process that died before finishing it.
+            dead = IngestionJob(
+                namespace="library",
+                filename="dead.txt",
+                file_path=path,
+                status="running",
+                owner="gone:1:dead",
+                lease_expires_at=datetime.utcnow() - timedelta(seconds=1),
+            )
+            live = IngestionJob(
+                namespace="library",
+                filename="live.txt",
+                file_path=upload("live.txt"),
+                status="running",
+                owner="other:2:live",
+                lease_expires_at=datetime.utcnow() + timedelta(minutes=5),
+            )
+            db.add_all([dead, live])
+            await db.commit()
+
+        queue = IngestionJobQueue(session_factory, workers=1, lease_seconds=5, poll_seconds=0.05)
+        await queue.start()
+        try:
+            (resumed,) = await wait_for(queue, [dead.id])
+            await asyncio.sleep(0.2)
+            return resumed, await queue.get(live.id)
+        finally:
+            await queue.stop()
+
+    resumed, untouched = event_loop_runner(scenario())
+
+    assert resumed.status == "completed"
+    assert untouched.status == "running" and untouched.owner == "other:2:live"
+    assert runs["runs"] == [resumed.file_path]
+
+
+def test_stop_releases_running_jobs(session_factory, event_loop_runner, upload, monkeypatch):
+    async def slow_process_and_store(**kwargs):
+        await asyncio.sleep(30)
+
+    monkeypatch.setattr(ingestion_queue, "process_and_store", slow_process_and_store)
+
+    async def scenario():
+        queue = IngestionJobQueue(session_factory, workers=1, lease_seconds=5, poll_seconds=0.05)
+        await queue.start()
+        try:
+            job = await queue.submit("library", "slow.txt", upload("slow.txt"))
+            while (await queue.get(job.id)).status != "running":
+                await asyncio.sleep(0.02)
+        finally:
+            await queue.stop()
+        return await queue.get(job.id)
+
+    released = event_loop_runner(scenario())
+
+    assert released.status == "queued"
+    assert released.owner is None and released.lease_expires_at is None
+
+
+def test_delete_waits_for_queued_upload(
+    session_factory, event_loop_runner, runs, upload, monkeypatch
+):
+    deletes = []
+
+    class FakeManifest:
+        def find(self, namespace, filename):
+            return {"id": f"{namespace}/{filename}"}
+
+    async def fake_delete_document(document_id):
+        # Records how many uploads had been processed when the delete ran.
+        deletes.append((document_id, len(runs["runs"])))
+
+    monkeypatch.setattr(ingestion_queue, "document_manifest", FakeManifest())
+    monkeypatch.setattr(ingestion_queue, "delete_document", fake_delete_document)
+
+    async def scenario():
+        queue = IngestionJobQueue(session_factory, workers=2, lease_seconds=5, poll_seconds=0.05)
+        await queue.start()
+        try:
+            ingest = await queue.submit("library", "report.txt", upload("report.txt"))
+            delete = await queue.submit_delete("library", "report.txt")
+            return await wait_for(queue, [ingest.id, delete.id])
+        finally:
+            await queue.stop()
+
+    ingest, delete = event_loop_runner(scenario())
+
+    assert (ingest.action, delete.action) == ("ingest", "delete")
+    assert ingest.status == delete.status == "completed"
+    assert deletes == [("library/report.txt", 1)]
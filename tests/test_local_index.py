@@ -0,0 +1,57 @@
+import time
+
+import numpy as np
+
+from src.vectorstore.local_index import LocalVectorIndex
+
+
+def vectors(count, dimension=16, seed=0):
+    return np.random.default_rng(seed).standard_normal((count, dimension)).astype(np.float32)
+
+
+def test_ivf_is_built_in_background_with_exact_fallback(tmp_path, event_loop_runner):
+    index = LocalVectorIndex(str(tmp_path), ann_min_vectors=500, nprobe=4)
+    data = vectors(2000)
+    for start in range(0, len(data), 500):
+        event_loop_runner(
+            index.upsert(
+                [{"id": f"v{i}", "values": data[i].tolist()} for i in range(start, start + 500)],
+                namespace="ns",
+            )
+        )
+    namespace = index.namespace("ns")
+
+    # Until the IVF matches the current rows, queries are exact.
+    result = event_loop_runner(index.query(data[7].tolist(), top_k=3, namespace="ns"))
+    assert result["matches"][0]["id"] == "v7"
+
+    deadline = time.monotonic() + 10
+    while namespace._building or namespace._ivf is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    result = event_loop_runner(index.query(data[7].tolist(), top_k=3, namespace="ns"))
+    assert result["matches"][0]["id"] == "v7"
+
+    event_loop_runner(index.delete(["v7"], namespace="ns"))
+    result = event_loop_runner(index.query(data[7].tolist(), top_k=3, namespace="ns"))
+    assert "v7" not in [match["id"] for match in result["matches"]]
+
+
+def test_empty_candidates_return_no_matches(tmp_path, event_loop_runner):
+    index = LocalVectorIndex(str(tmp_path), ann_min_vectors=10, nprobe=2)
+    data = vectors(50)
+    event_loop_runner(
+        index.upsert([{"id": f"v{i}", "values": row.tolist()} for i, row in enumerate(data)], "ns")
+    )
+    namespace = index.namespace("ns")
+    while namespace._building or namespace._ivf is None:
+        time.sleep(0.01)
+    # Every cluster empty, as after clustering an unlucky sample.
+    namespace._ivf["bounds"][:] = 0
+
+    assert event_loop_runner(index.query(data[0].tolist(), top_k=3, namespace="ns")) == {
+        "matches": []
+    }
+    assert event_loop_runner(index.query(data[0].tolist(), top_k=0, namespace="ns")) == {
+        "matches": []
+    }
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+from src.vectorstore.micro_batcher import MicroBatcher
+
+
+def test_batches_items_per_event_loop():
+    batches = []
+
+    async def handler(items):
+        batches.append(list(items))
+        await asyncio.sleep(0.01)
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(handler, max_batch_size=100, max_wait_ms=20)
+    results = {}
+
+    def run(name):
+        async def submit_all():
+            return await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+
+        results[name] = asyncio.run(submit_all())
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    # Both loops get every answer, and no batch mixes their items.
+    assert results == {"a": [i * 2 for i in range(10)], "b": [i * 2 for i in range(10)]}
+    assert sorted(batches) == [list(range(10)), list(range(10))]
+    assert batcher._pending == {} and batcher._timers == {}
+
+
+def test_handler_errors_reach_each_caller():
+    async def handler(items):
+        return [ValueError(item) if item % 2 else item for item in items]
+
+    batcher = MicroBatcher(handler, max_batch_size=4, max_wait_ms=5)
+
+    async def submit_all():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(4)), return_exceptions=True)
+
+    results = asyncio.run(submit_all())
+    assert results[0] == 0 and results[2] == 2
+    assert isinstance(results[1], ValueError) and isinstance(results[3], ValueError)
@@ -0,0 +1,60 @@
+from sqlalchemy import create_engine, text
+from sqlmodel import SQLModel
+
+import src.models.user  # noqa: F401
+import src.models.job  # noqa: F401
+import src.models.legacy_namespace  # noqa: F401
+from src.db.migrations import add_job_columns, library_migration_pending, migrate_library_ids
+
+
+# The user and job tables as they were before library IDs, job leases and reuse counts.
+BASELINE_SCHEMA = [
+    'CREATE TABLE "user" (id INTEGER PRIMARY KEY, email VARCHAR, hashed_password VARCHAR, '
+    "session_id VARCHAR)",
+    "CREATE TABLE ingestionjob (id VARCHAR PRIMARY KEY, session_id VARCHAR, filename VARCHAR, "
+    "file_path VARCHAR, status VARCHAR, chunks_total INTEGER, chunks_embedded INTEGER, "
+    "batches_upserted INTEGER, error VARCHAR, created_at DATETIME, updated_at DATETIME)",
+    """INSERT INTO "user" VALUES (1, 'a@example.com', 'x', 'current'), (2, 'b@example.com', 'x', NULL)""",
+    "INSERT INTO ingestionjob VALUES "
+    "('j1', 'current', 'a.txt', 'p', 'completed', 1, 1, 1, NULL, '2024-02-01', '2024-02-01'), "
+    "('j2', 'earlier', 'b.txt', 'p', 'completed', 1, 1, 1, NULL, '2024-01-01', '2024-01-01'), "
+    "('j3', 'earlier', 'c.txt', 'p', 'completed', 1, 1, 1, NULL, '2024-01-02', '2024-01-02')",
+]
+
+
+def migrate(engine, stored_namespaces=()):
+    with engine.begin() as conn:
+        SQLModel.metadata.create_all(conn)
+        add_job_columns(conn)
+        pending = library_migration_pending(conn)
+        migrate_library_ids(conn, stored_namespaces)
+    return pending
+
+
+def test_migrate_library_ids_is_idempotent(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as conn:
+        for statement in BASELINE_SCHEMA:
+            conn.execute(text(statement))
+
+    assert migrate(engine, {"current", "earlier", "index-only", ""})
+    with engine.connect() as conn:
+        libraries = dict(conn.execute(text('SELECT id, library_id FROM "user"')).fetchall())
+        legacy = conn.execute(
+            text("SELECT namespace, jobs, released FROM legacynamespace ORDER BY namespace")
+        ).fetchall()
+        jobs = conn.execute(text("SELECT namespace, action, chunks_reused FROM ingestionjob")).fetchall()
+
+    # The current session's documents stay with their user; the other user gets a new library.
+    assert libraries[1] == "current"
+    assert libraries[2] and libraries[2] != "current"
+    assert legacy == [("earlier", 2, 0), ("index-only", 0, 0)]
+    assert sorted(jobs) == [("current", "ingest", 0), ("earlier", "ingest", 0), ("earlier", "ingest", 0)]
+
+    assert not migrate(engine, {"late-namespace"})
+    with engine.connect() as conn:
+        assert dict(conn.execute(text('SELECT id, library_id FROM "user"')).fetchall()) == libraries
+        assert conn.execute(
+            text("SELECT namespace, jobs, released FROM legacynamespace ORDER BY namespace")
+        ).fetchall() == legacy
+    engine.dispose()
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+from src.jobs.namespace_gc import NamespaceCollector
+from src.models.job import IngestionJob
+from src.models.legacy_namespace import LegacyNamespace
+from src.models.user import User
+
+
+class FakeStore:
+    def __init__(self, namespaces):
+        self.names = set(namespaces)
+
+    def namespaces(self):
+        return sorted(self.names)
+
+    def delete_namespace(self, namespace):
+        self.names.discard(namespace)
+
+
+class FakeIndex(FakeStore):
+    async def list_namespaces(self):
+        return self.namespaces()
+
+    async def delete_namespace(self, namespace):
+        self.names.discard(namespace)
+
+
+def add_rows(session_factory, event_loop_runner, *rows):
+    async def add():
+        async with session_factory() as db:
+            db.add_all(rows)
+            await db.commit()
+
+    event_loop_runner(add())
+
+
+def collector(session_factory, index, chunk_store, manifest, **options):
+    async def index_factory():
+        return index
+
+    return NamespaceCollector(
+        session_factory=session_factory,
+        index_factory=index_factory,
+        chunk_store=chunk_store,
+        document_manifest=manifest,
+        **options,
+    )
+
+
+def test_collects_only_app_owned_orphans(session_factory, event_loop_runner):
+    recorded = datetime.utcnow() - timedelta(days=10)
+    add_rows(
+        session_factory,
+        event_loop_runner,
+        User(email="a@example.com", hashed_password="x", library_id="library"),
+        IngestionJob(namespace="uploading", filename="a.txt", file_path="p", status="running"),
+        IngestionJob(namespace="finished", filename="a.txt", file_path="p", status="completed"),
+        LegacyNamespace(namespace="legacy-kept", recorded_at=recorded),
+        LegacyNamespace(namespace="legacy-released", released=True, recorded_at=recorded),
+    )
+    index = FakeIndex(
+        ["", "library", "uploading", "finished", "legacy-kept", "legacy-released", "foreign"]
+    )
+    chunk_store = FakeStore(["library", "stale-store", "finished"])
+    manifest = FakeStore(["library", "stale-manifest"])
+    gc = collector(session_factory, index, chunk_store, manifest, dry_run=True)
+
+    expected = ["finished", "legacy-released", "stale-manifest", "stale-store"]
+    assert event_loop_runner(gc.collect()) == expected
+    assert "finished" in index.names
+
+    gc.dry_run = False
+    assert event_loop_runner(gc.collect()) == expected
+    assert index.names == {"", "library", "uploading", "legacy-kept", "foreign"}
+    assert chunk_store.names == {"library"}
+    assert manifest.names == {"library"}
+
+    # Legacy namespaces past their retention are collected even when they were not released.
+    gc.legacy_retention_days = 7
+    assert event_loop_runner(gc.collect()) == ["legacy-kept"]
+
+
+def test_skips_collection_without_users(session_factory, event_loop_runner):
+    index = FakeIndex(["orphan"])
+    chunk_store = FakeStore(["orphan"])
+    gc = collector(session_factory, index, chunk_store, FakeStore([]))
+
+    assert event_loop_runner(gc.collect()) == []
+    assert chunk_store.names == {"orphan"}
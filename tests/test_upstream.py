@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+from src.vectorstore.upstream import CircuitBreaker, UpstreamClient, UpstreamUnavailable
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("embeddings", failure_threshold=3, reset_timeout=60)
+
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_breaker_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker("chat", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def test_open_breaker_fails_fast(fake_ultrasafe):
+    fake_ultrasafe.embedding_status = 500
+    client = UpstreamClient(max_retries=0, breaker_threshold=2, breaker_reset_seconds=60)
+    url = f"{fake_ultrasafe.url}/embeddings"
+
+    for _ in range(2):
+        assert client.post("embeddings", url, json={"input": "x"}).status_code == 500
+    with pytest.raises(UpstreamUnavailable):
+        client.post("embeddings", url, json={"input": "x"})
+
+    assert fake_ultrasafe.embedding_batches == [1, 1]